@@ -1,9 +1,90 @@
+from functools import wraps
+
 import streamlit as st
 
 from components.ui.semantic_search_tab import SemanticSearchTabUI
 from components.ui.data_visualization_tab import DataVisualizationTabUI
 
 
+def _section_errors(label: str):
+    """Error boundary for a data tab section: render failures as st.error instead of raising"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                st.error(f"❌ {label} error: {str(e)}")
+        return wrapper
+    return decorator
+
+
+# --- Data tab sections (charts and tables only; no widgets, so they render with the tab) ---
+@_section_errors("Portfolio section")
+def _portfolio_section(data_viz_tab: DataVisualizationTabUI, portfolio: dict):
+    # ROI section (static, lightweight)
+    data_viz_tab.render_roi_section()
+    st.markdown("---")
+    data_viz_tab.render_strategic_insights_header()
+    # Separation between overall title/statement and charts
+    st.markdown("---")
+    # Bubble chart title and key insight before the chart
+    st.subheader("Competitive Landscape: Portfolio Breadth vs. Complexity")
+    # Insight before the chart
+    st.caption("Key Insight: Companies in the top-right quadrant demonstrate both diverse and highly complex patent portfolios.")
+    if portfolio.get('success') and portfolio.get('data') and portfolio['data'].get('has_plotly'):
+        st.plotly_chart(portfolio['data']['figure'], use_container_width=True)
+        if portfolio.get('message'):
+            st.success(f"✅ {portfolio['message']}")
+    else:
+        st.error(f"❌ Portfolio analysis failed: {portfolio.get('message', 'No message')}")
+    st.markdown("---")
+
+
+@_section_errors("Distribution section")
+def _distribution_section(distribution: dict):
+    st.subheader("Invention Complexity Analysis")
+    # Insight before the chart
+    if distribution.get('success') and distribution.get('data') and distribution['data'].get('has_plotly'):
+        st.caption("""
+        Key Insight: The distribution shows that most patents are of low-to-medium complexity (2-10 components). The long tail of outliers corresponds to inventions with detailed technical diagrams, proving that our multimodal analysis is essential for capturing true architectural complexity.
+        """)
+        st.plotly_chart(distribution['data']['figure'], use_container_width=True)
+        if distribution.get('message'):
+            st.success(f"✅ {distribution['message']}")
+    else:
+        st.error(f"❌ Distribution analysis failed: {distribution.get('message', 'No message')}")
+    st.markdown("---")
+
+
+@_section_errors("Outlier section")
+def _outlier_section(outliers: dict):
+    st.markdown("**Component Count Outlier Detection**")
+    if outliers.get('success'):
+        df_out = outliers.get('data')
+        msg = outliers.get('message', '')
+        if df_out is not None and hasattr(df_out, 'empty') and not df_out.empty:
+            st.warning(f"⚠️ {msg}")
+            # Render with clickable link if 'Open' URL column present
+            col_cfg = None
+            try:
+                if 'Open' in df_out.columns:
+                    col_cfg = {
+                        'Open': st.column_config.LinkColumn(
+                            'Open',
+                            help='Open the PDF in a new tab',
+                            display_text='open patent ↗'
+                        )
+                    }
+            except Exception:
+                col_cfg = None
+            st.dataframe(df_out, use_container_width=True, hide_index=True, column_config=col_cfg)
+        else:
+            st.success(f"✅ {msg}")
+    else:
+        st.error(f"❌ Outlier detection failed: {outliers.get('message', 'No message')}")
+
+
 class DashboardUI:
     """Dashboard UI Coordinator - combines tab components"""
 
@@ -48,85 +129,6 @@ class DashboardUI:
             'outlier_section': outlier_section
         }
 
-    def render_data_tab_connected(self, portfolio: dict, distribution: dict, outliers: dict):
-        """Render data tab when connected, delegating section rendering with spinners"""
-        sections = self.render_data_tab_connected_progressive()
-
-        # Portfolio section
-        with sections['portfolio_section'].container():
-            # ROI section (static, lightweight)
-            self.data_viz_tab.render_roi_section()
-            st.markdown("---")
-            with st.spinner("Loading strategic portfolio analysis..."):
-                try:
-                    self.data_viz_tab.render_strategic_insights_header()
-                    # Separation between overall title/statement and charts
-                    st.markdown("---")
-                    # Chart title (visible above the figure)
-                    st.subheader("Competitive Landscape: Portfolio Breadth vs. Complexity")
-                    # Key insight before the chart
-                    st.caption("Key Insight: Companies in the top-right quadrant demonstrate both diverse and highly complex patent portfolios.")
-                    if portfolio.get('success') and portfolio.get('data') and portfolio['data'].get('has_plotly'):
-                        st.plotly_chart(portfolio['data']['figure'], use_container_width=True)
-                        if portfolio.get('message'):
-                            st.success(f"✅ {portfolio['message']}")
-                    else:
-                        st.error(f"❌ Portfolio analysis failed: {portfolio.get('message', 'No message')}")
-                    st.markdown("---")
-                except Exception as e:
-                    st.error(f"❌ Portfolio section error: {str(e)}")
-
-        # Distribution section
-        with sections['distribution_section'].container():
-            with st.spinner("Loading component distribution analysis..."):
-                try:
-                    # Chart title (visible above the figure)
-                    st.subheader("Invention Complexity Analysis")
-                    # Key insight before the chart
-                    if distribution.get('success') and distribution.get('data') and distribution['data'].get('has_plotly'):
-                        st.caption("""
-                        Key Insight: The distribution shows that most patents are of low-to-medium complexity (2-10 components). The long tail of outliers corresponds to inventions with detailed technical diagrams, proving that our multimodal analysis is essential for capturing true architectural complexity.
-                        """)
-                        st.plotly_chart(distribution['data']['figure'], use_container_width=True)
-                        if distribution.get('message'):
-                            st.success(f"✅ {distribution['message']}")
-                    else:
-                        st.error(f"❌ Distribution analysis failed: {distribution.get('message', 'No message')}")
-                    st.markdown("---")
-                except Exception as e:
-                    st.error(f"❌ Distribution section error: {str(e)}")
-
-        # Outlier section
-        with sections['outlier_section'].container():
-            with st.spinner("Performing outlier detection analysis..."):
-                try:
-                    st.markdown("**Component Count Outlier Detection**")
-                    if outliers.get('success'):
-                        df_out = outliers.get('data')
-                        msg = outliers.get('message', '')
-                        if df_out is not None and hasattr(df_out, 'empty') and not df_out.empty:
-                            st.warning(f"⚠️ {msg}")
-                            # Render with clickable link if 'Open' URL column present
-                            col_cfg = None
-                            try:
-                                if 'Open' in df_out.columns:
-                                    col_cfg = {
-                                        'Open': st.column_config.LinkColumn(
-                                            'Open',
-                                            help='Open the PDF in a new tab',
-                                            display_text='open patent ↗'
-                                        )
-                                    }
-                            except Exception:
-                                col_cfg = None
-                            st.dataframe(df_out, use_container_width=True, hide_index=True, column_config=col_cfg)
-                        else:
-                            st.success(f"✅ {msg}")
-                    else:
-                        st.error(f"❌ Outlier detection failed: {outliers.get('message', 'No message')}")
-                except Exception as e:
-                    st.error(f"❌ Outlier section error: {str(e)}")
-
     def run_with_spinner(self, target, message: str, fn):
         """Run a callable within a spinner tied to a placeholder; return its result.
         Expects fn to return either a tuple or a single value.
@@ -135,94 +137,17 @@ class DashboardUI:
             with st.spinner(message):
                 return fn()
 
-    # --- Progressive section helpers used by engine.run_data_tab ---
-    def render_portfolio_section_loading(self, target):
-        with target.container():
-            with st.spinner("Loading strategic portfolio analysis..."):
-                self.data_viz_tab.render_strategic_insights_header()
-                st.empty()
-
-    def render_distribution_section_loading(self, target):
-        with target.container():
-            with st.spinner("Loading component distribution analysis..."):
-                st.empty()
-
-    def render_outlier_section_loading(self, target):
-        with target.container():
-            with st.spinner("Performing outlier detection analysis..."):
-                st.markdown("**Component Count Outlier Detection**")
-                st.empty()
-
     def render_portfolio_section(self, target, portfolio: dict):
         with target.container():
-            try:
-                # ROI section (static, lightweight)
-                self.data_viz_tab.render_roi_section()
-                st.markdown("---")
-                self.data_viz_tab.render_strategic_insights_header()
-                # Separation between overall title/statement and charts
-                st.markdown("---")
-                # Bubble chart title and key insight before the chart
-                st.subheader("Competitive Landscape: Portfolio Breadth vs. Complexity")
-                # Insight before the chart
-                st.caption("Key Insight: Companies in the top-right quadrant demonstrate both diverse and highly complex patent portfolios.")
-                if portfolio.get('success') and portfolio.get('data') and portfolio['data'].get('has_plotly'):
-                    st.plotly_chart(portfolio['data']['figure'], use_container_width=True)
-                    if portfolio.get('message'):
-                        st.success(f"✅ {portfolio['message']}")
-                else:
-                    st.error(f"❌ Portfolio analysis failed: {portfolio.get('message', 'No message')}")
-                st.markdown("---")
-            except Exception as e:
-                st.error(f"❌ Portfolio section error: {str(e)}")
+            _portfolio_section(self.data_viz_tab, portfolio)
 
     def render_distribution_section(self, target, distribution: dict):
         with target.container():
-            try:
-                st.subheader("Invention Complexity Analysis")
-                # Insight before the chart
-                if distribution.get('success') and distribution.get('data') and distribution['data'].get('has_plotly'):
-                    st.caption("""
-                    Key Insight: The distribution shows that most patents are of low-to-medium complexity (2-10 components). The long tail of outliers corresponds to inventions with detailed technical diagrams, proving that our multimodal analysis is essential for capturing true architectural complexity.
-                    """)
-                    st.plotly_chart(distribution['data']['figure'], use_container_width=True)
-                    if distribution.get('message'):
-                        st.success(f"✅ {distribution['message']}")
-                else:
-                    st.error(f"❌ Distribution analysis failed: {distribution.get('message', 'No message')}")
-                st.markdown("---")
-            except Exception as e:
-                st.error(f"❌ Distribution section error: {str(e)}")
+            _distribution_section(distribution)
 
     def render_outlier_section(self, target, outliers: dict):
         with target.container():
-            try:
-                st.markdown("**Component Count Outlier Detection**")
-                if outliers.get('success'):
-                    df_out = outliers.get('data')
-                    msg = outliers.get('message', '')
-                    if df_out is not None and hasattr(df_out, 'empty') and not df_out.empty:
-                        st.warning(f"⚠️ {msg}")
-                        # Render with clickable link if 'Open' URL column present
-                        col_cfg = None
-                        try:
-                            if 'Open' in df_out.columns:
-                                col_cfg = {
-                                    'Open': st.column_config.LinkColumn(
-                                        'Open',
-                                        help='Open the PDF in a new tab',
-                                        display_text='open patent ↗'
-                                    )
-                                }
-                        except Exception:
-                            col_cfg = None
-                        st.dataframe(df_out, use_container_width=True, hide_index=True, column_config=col_cfg)
-                    else:
-                        st.success(f"✅ {msg}")
-                else:
-                    st.error(f"❌ Outlier detection failed: {outliers.get('message', 'No message')}")
-            except Exception as e:
-                st.error(f"❌ Outlier section error: {str(e)}")
+            _outlier_section(outliers)
 
     def render_section_error(self, target, message: str):
         with target.container():
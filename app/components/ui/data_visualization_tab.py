@@ -7,9 +7,11 @@ class DataVisualizationTabUI:
 
     def render_roi_section(self):
         """Render Business Impact & ROI metrics section above charts"""
-        st.header("Business Impact & ROI")
+        # Heading and intro in one element
         st.markdown(
             """
+            ## Business Impact & ROI
+
             The insights on this page are derived from an automated AI pipeline that transforms raw PDFs into a queryable intelligence asset. This approach delivers a transformative and quantifiable return on investment compared to traditional manual analysis.
             """
         )
@@ -44,8 +46,9 @@ class DataVisualizationTabUI:
 
     def render_strategic_insights_header(self):
         """Display strategic insights section header"""
-        st.markdown("#### 🎯 Strategic Insights from the Patent Corpus")
         st.markdown("""
+            #### 🎯 Strategic Insights from the Patent Corpus
+
             The visualizations below provide a high-level overview of the 
             entire 403-patent dataset. 
             These strategic insights are only possible because BigQuery AI 
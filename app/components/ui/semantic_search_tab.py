@@ -1,3 +1,5 @@
+import json
+
 import streamlit as st
 import pandas as pd
 
@@ -15,10 +17,11 @@ class SemanticSearchTabUI:
         col1, col2, col3 = st.columns([1, 2, 1])
         
         with col2:
-            # Combined, concise intro
-            st.header("🔎 Semantic Component Search")
+            # Combined, concise intro (heading + text in one element)
             st.markdown(
                 """
+                ## 🔎 Semantic Component Search
+
                 Enter a technical function below to search the knowledge graph. The AI-powered search will find the most functionally similar components and their parent patents, regardless of keywords.
                 """
             )
@@ -137,20 +140,18 @@ class SemanticSearchTabUI:
             # Show top components immediately
             if top_components_df is not None:
                 try:
-                    import pandas as _pd  # local import to avoid global hard dep
                     if isinstance(top_components_df, list):
                         # If list contains JSON strings, parse them first
                         if len(top_components_df) > 0 and isinstance(top_components_df[0], str):
-                            import json as _json
                             parsed = []
                             for _s in top_components_df:
                                 try:
-                                    parsed.append(_json.loads(_s))
+                                    parsed.append(json.loads(_s))
                                 except Exception:
                                     continue
-                            _df = _pd.DataFrame(parsed)
+                            _df = pd.DataFrame(parsed)
                         else:
-                            _df = _pd.DataFrame(top_components_df)
+                            _df = pd.DataFrame(top_components_df)
                     else:
                         _df = top_components_df
                     if _df is not None and not _df.empty:
@@ -162,9 +163,8 @@ class SemanticSearchTabUI:
             if callable(load_details):
                 try:
                     details = load_details()
-                    import pandas as _pd
                     if isinstance(details, list):
-                        details_df = _pd.DataFrame(details)
+                        details_df = pd.DataFrame(details)
                     else:
                         details_df = details
                     if details_df is not None and not details_df.empty:
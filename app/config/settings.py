@@ -1,5 +1,6 @@
 import os
 import json
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -57,9 +58,33 @@ BQ_LOCATION = os.getenv("BQ_LOCATION") or _from_secrets("BQ_LOCATION", "US")
 BQ_DATASET_ID = os.getenv("BQ_DATASET_ID") or _from_secrets("BQ_DATASET_ID")
 BQ_TABLE_PATENT_KNOWLEDGE_GRAPH = os.getenv("BQ_TABLE_PATENT_KNOWLEDGE_GRAPH", "patent_knowledge_graph")
 
+# Authenticate in a background thread at import so the first request finds a warm client
+BQ_EAGER_INIT = _get_bool(os.getenv("BQ_EAGER_INIT") or _from_secrets("BQ_EAGER_INIT", "False"), False)
+
+# Semantic search cache directory (persists paraphrase-cache hits across restarts; unset = memory only)
+SEMANTIC_CACHE_DIR = os.getenv("SEMANTIC_CACHE_DIR") or _from_secrets("SEMANTIC_CACHE_DIR")
+
+# BigQuery table in BQ_DATASET_ID caching query embeddings across restarts/replicas (unset = disabled)
+EMBEDDING_CACHE_TABLE = os.getenv("EMBEDDING_CACHE_TABLE") or _from_secrets("EMBEDDING_CACHE_TABLE")
+
+# Directory of an exported local vector index (see services/local_vector_index.py; unset = VECTOR_SEARCH)
+LOCAL_VECTOR_INDEX_DIR = os.getenv("LOCAL_VECTOR_INDEX_DIR") or _from_secrets("LOCAL_VECTOR_INDEX_DIR")
+
+# Reject non-technical queries with the LLM check, fused into the search job (off = search everything)
+CLASSIFY_QUERIES = _get_bool(os.getenv("CLASSIFY_QUERIES") or _from_secrets("CLASSIFY_QUERIES", "False"), False)
+
+# Near-duplicate patent table in BQ_DATASET_ID for the search diversity filter (unset = disabled)
+COMPONENT_CUTOFF_TABLE = os.getenv("COMPONENT_CUTOFF_TABLE") or _from_secrets("COMPONENT_CUTOFF_TABLE")
+
 # Essential Constants
 DEBUG_MODE = _get_bool(os.getenv("DEBUG_MODE") or _from_secrets("DEBUG_MODE", "False"), False)
 
+@lru_cache(maxsize=4)
+def _parse_sa_key_json(raw: str) -> dict:
+    """Parse the service account JSON once per distinct value (validation runs on every rerun)"""
+    return json.loads(raw)
+
+
 # Validation function
 def validate_config():
     """Validate required configuration"""
@@ -77,7 +102,7 @@ def validate_config():
     # Validate JSON format of service account key
     if GCP_SA_KEY_JSON:
         try:
-            json.loads(GCP_SA_KEY_JSON)
+            _parse_sa_key_json(GCP_SA_KEY_JSON)
         except json.JSONDecodeError:
             raise ValueError("GCP_SA_KEY must be valid JSON")
     
@@ -3,10 +3,10 @@ from dataclasses import dataclass
 
 from core.models import SearchRequest, SearchResponse, ConnectionStatus, AppStats
 from utils.connection_utils import check_bigquery_connection, validate_environment, get_app_stats, format_number
-from utils.gcp_auth import get_bigquery_client
+from utils.gcp_auth import get_bigquery_client, get_bqstorage_client
 from services.semantic_search import SemanticSearchService, SearchConfig
-from services.visualization_service import VisualizationService
-from utils.gcs_signer import generate_v4_signed_url
+from services.visualization_service import VisualizationService, VisualizationResult
+from utils.gcs_signer import generate_v4_signed_url, generate_v4_signed_urls
 import pandas as pd
 
 
@@ -15,16 +15,32 @@ class AppConfig:
     """Configuration for application controller"""
     project_id: str
     dataset_id: str = "patent_analysis"
+    semantic_cache_dir: Optional[str] = None
+    embedding_cache_table: Optional[str] = None
+    local_index_dir: Optional[str] = None
+    cutoff_table: Optional[str] = None
+    classify_queries: bool = False
     
     @classmethod
     def from_environment(cls) -> 'AppConfig':
         """Create config from settings (supports Streamlit secrets fallback)"""
-        from config.settings import GOOGLE_CLOUD_PROJECT_ID, BQ_DATASET_ID
+        from config.settings import (
+            GOOGLE_CLOUD_PROJECT_ID, BQ_DATASET_ID, SEMANTIC_CACHE_DIR, EMBEDDING_CACHE_TABLE,
+            LOCAL_VECTOR_INDEX_DIR, COMPONENT_CUTOFF_TABLE, CLASSIFY_QUERIES,
+        )
         project_id = GOOGLE_CLOUD_PROJECT_ID
         if not project_id:
             raise ValueError("GOOGLE_CLOUD_PROJECT_ID environment variable is required")
         dataset_id = BQ_DATASET_ID or "patent_analysis"
-        return cls(project_id=project_id, dataset_id=dataset_id)
+        return cls(
+            project_id=project_id,
+            dataset_id=dataset_id,
+            semantic_cache_dir=SEMANTIC_CACHE_DIR,
+            embedding_cache_table=EMBEDDING_CACHE_TABLE,
+            local_index_dir=LOCAL_VECTOR_INDEX_DIR,
+            cutoff_table=COMPONENT_CUTOFF_TABLE,
+            classify_queries=CLASSIFY_QUERIES,
+        )
 
 
 class AppController:
@@ -35,7 +51,8 @@ class AppController:
                  bigquery_client=None, 
                  visualization_service=None, 
                  semantic_search_service=None,
-                 bigquery_client_provider: Optional[Callable[[], Any]] = None):
+                 bigquery_client_provider: Optional[Callable[[], Any]] = None,
+                 bqstorage_client_provider: Optional[Callable[[], Any]] = None):
         """
         Initialize the controller with configuration and optional dependencies for testing
         
@@ -44,6 +61,7 @@ class AppController:
             bigquery_client: Optional BigQuery client for testing
             visualization_service: Optional visualization service for testing  
             semantic_search_service: Optional search service for testing
+            bqstorage_client_provider: Optional provider of a BigQuery Storage read client
         """
         self.config = config or AppConfig.from_environment()
         self._bigquery_client = bigquery_client
@@ -51,6 +69,11 @@ class AppController:
         self._semantic_search_service = semantic_search_service
         # Provider function for obtaining a BigQuery client (DI-friendly)
         self._bigquery_client_provider = bigquery_client_provider or (lambda: get_bigquery_client())
+        # Storage API read client pairs with the default client only; injected clients download over REST
+        default_client = bigquery_client is None and bigquery_client_provider is None
+        self._bqstorage_client_provider = bqstorage_client_provider or (
+            get_bqstorage_client if default_client else (lambda: None)
+        )
     
     def _get_bigquery_setup(self):
         """Get BigQuery client and project ID, return (client, project_id, error_message)"""
@@ -76,7 +99,7 @@ class AppController:
             client, project_id, error = self._get_bigquery_setup()
             if error:
                 return None
-            self._visualization_service = VisualizationService(client)
+            self._visualization_service = VisualizationService(client, self._bqstorage_client_provider())
         return self._visualization_service
     
     def _get_semantic_search_service(self):
@@ -85,8 +108,16 @@ class AppController:
             client, project_id, error = self._get_bigquery_setup()
             if error:
                 return None
-            config = SearchConfig(project_id=project_id, dataset_id=self.config.dataset_id)
-            self._semantic_search_service = SemanticSearchService(config, client)
+            config = SearchConfig(
+                project_id=project_id,
+                dataset_id=self.config.dataset_id,
+                cache_path=self.config.semantic_cache_dir,
+                embedding_cache_table=self.config.embedding_cache_table,
+                local_index_path=self.config.local_index_dir,
+                cutoff_table=self.config.cutoff_table,
+                classify_queries=self.config.classify_queries,
+            )
+            self._semantic_search_service = SemanticSearchService(config, client, self._bqstorage_client_provider())
         return self._semantic_search_service
     
     def _format_search_results(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -100,8 +131,9 @@ class AppController:
             'component_function': 'Function',
         })
         
-        # Calculate similarity percentage
-        display_df['Similarity'] = ((1 - display_df['distance']) * 100).round().astype(int)
+        # Calculate similarity percentage; int8 covers the ProgressColumn's 0-100 range
+        # and serializes to Arrow as one narrow primitive buffer
+        display_df['Similarity'] = ((1 - display_df['distance']) * 100).round().astype('int8')
         
         # Drop the distance column
         display_df = display_df.drop(columns=['distance'])
@@ -114,54 +146,52 @@ class AppController:
     
     def format_search_results_for_display(self, response: SearchResponse) -> pd.DataFrame:
         """Convert SearchResponse to display DataFrame - extracted from dashboard"""
-        data = []
-        for result in response.results:
-            # Show only the filename part of the URI for cleaner display
-            raw_uri = result.patent_uri
-            file_name = str(raw_uri).split('/')[-1] if isinstance(raw_uri, str) else raw_uri
-            data.append({
-                "Patent URI": file_name,
-                "Component": result.component,
-                "Function": result.function,
-                "Similarity": result.similarity
+        if response.frame is not None:
+            # Reuse the columnar frame the response was built from; shorten URIs to file names
+            display_df = response.frame[["Patent URI", "Component", "Function", "Similarity"]]
+            return display_df.assign(**{
+                "Patent URI": display_df["Patent URI"].str.rsplit('/', n=1).str[-1]
             })
         
-        return pd.DataFrame(data)
+        results = response.results
+        # Build columns directly from attributes; show only the filename part of the URI
+        return pd.DataFrame({
+            "Patent URI": [
+                r.patent_uri.rsplit('/', 1)[-1] if isinstance(r.patent_uri, str) else r.patent_uri
+                for r in results
+            ],
+            "Component": [r.component for r in results],
+            "Function": [r.function for r in results],
+            "Similarity": pd.Series([r.similarity for r in results], dtype='int8'),
+        })
     
-    def get_formatted_component_outliers(self):
-        """Get component outliers with display formatting"""
-        success, message, df_outliers = self.get_component_outliers()
+    def _format_component_outliers(self, success: bool, message: str, df_outliers):
+        """Build the display-ready outlier table from a raw outlier result"""
         if success and df_outliers is not None and not df_outliers.empty:
             try:
-                # Build a display-ready DataFrame with a clickable signed URL
-                df = df_outliers.copy()
-                # Extract PDF file name from URI
-                df["PDF Name"] = df["uri"].apply(lambda x: str(x).split("/")[-1] if isinstance(x, str) else "")
+                # Build a display-ready DataFrame with a clickable signed URL, column by column
+                # (no copy of the raw frame, no intermediate rename)
+                uris = df_outliers["uri"]
 
-                # Generate signed URL per row (best-effort)
-                signed_urls: list[str | None] = []
-                for _uri in df["uri"].tolist():
-                    ok, _, url = self.get_signed_patent_url(str(_uri)) if isinstance(_uri, str) else (False, "", None)
-                    signed_urls.append(url if ok and url else None)
-                df["Open"] = signed_urls
+                # Generate signed URLs for all rows in one batched call (best-effort, None on failure)
+                signed_urls = self.get_signed_patent_urls(uris.tolist())
 
-                # Rename and select columns for display
-                df = df.rename(columns={
-                    "num_components": "Component Count",
-                })
-                display_df = df[["PDF Name", "Component Count", "Open"]].sort_values("Component Count", ascending=False)
+                display_df = pd.DataFrame({
+                    # Extract PDF file name from URI (vectorized; non-string URIs become "")
+                    "PDF Name": uris.str.rsplit("/", n=1).str[-1].fillna("").to_numpy(),
+                    "Component Count": df_outliers["num_components"].to_numpy(),
+                    "Open": signed_urls,
+                }).sort_values("Component Count", ascending=False)
                 return success, message, display_df
             except Exception:
                 # Fallback to raw if any formatting fails
                 return success, message, df_outliers
         return success, message, df_outliers
     
-    def get_formatted_distribution_chart_data(self):
-        """Get component distribution with chart formatting"""
-        success, message, df_distribution = self.get_component_distribution()
+    def _format_distribution_chart(self, success: bool, message: str, df_distribution,
+                                   outlier_success: bool, df_outliers):
+        """Build the histogram chart payload from raw distribution and outlier results"""
         if success and df_distribution is not None:
-            # Also get outliers for chart markers
-            outlier_success, _, df_outliers = self.get_component_outliers()
             visualization_service = self._get_visualization_service()
             if visualization_service:
                 chart_data = visualization_service.format_distribution_chart_data(
@@ -170,9 +200,8 @@ class AppController:
                 return success, message, chart_data
         return success, message, None
     
-    def get_formatted_portfolio_chart_data(self):
-        """Get portfolio analysis with chart formatting"""
-        success, message, df_portfolio = self.get_portfolio_analysis()
+    def _format_portfolio_chart(self, success: bool, message: str, df_portfolio):
+        """Build the bubble chart payload from a raw portfolio result"""
         if success and df_portfolio is not None:
             visualization_service = self._get_visualization_service()
             if visualization_service:
@@ -180,11 +209,45 @@ class AppController:
                 return success, message, chart_data
         return success, message, None
     
+    def fetch_dashboard_data(self):
+        """Fetch raw (portfolio, distribution, outliers) VisualizationResults with concurrent BigQuery jobs"""
+        visualization_service = self._get_visualization_service()
+        if not visualization_service:
+            unavailable = VisualizationResult(
+                success=False,
+                message="Visualization service not available",
+                error_type="client_unavailable"
+            )
+            return unavailable, unavailable, unavailable
+        results = visualization_service.get_dashboard_data(self.config.project_id)
+        return results['portfolio'], results['distribution'], results['outliers']
+    
+    def get_dashboard_data_version(self) -> Optional[str]:
+        """Version of the dashboard's source data (latest table modification), None if unknown"""
+        visualization_service = self._get_visualization_service()
+        if not visualization_service:
+            return None
+        return visualization_service.get_data_version(self.config.project_id)
+    
+    def format_dashboard_bundle(self, raw_results):
+        """Format raw dashboard results into chart payloads and the outlier table (signed links included)"""
+        portfolio, distribution, outliers = raw_results
+        return (
+            self._format_portfolio_chart(portfolio.success, portfolio.message, portfolio.data),
+            self._format_distribution_chart(
+                distribution.success, distribution.message, distribution.data,
+                outliers.success, outliers.data
+            ),
+            self._format_component_outliers(outliers.success, outliers.message, outliers.data),
+        )
+    
     def get_connection_status(self) -> ConnectionStatus:
         """Get current connection status"""
         env_valid, env_msg = validate_environment()
-        # Use injected or cached client for the connectivity probe
-        client = self._bigquery_client or self._bigquery_client_provider()
+        # Use injected or cached client for the connectivity probe, keeping it for later service setup
+        if not self._bigquery_client:
+            self._bigquery_client = self._bigquery_client_provider()
+        client = self._bigquery_client
         gcp_connected, gcp_msg = check_bigquery_connection(client)
         
         return ConnectionStatus(
@@ -250,42 +313,6 @@ class AppController:
                 query=request.query
             )
     
-    def get_component_outliers(self):
-        """Get component outliers analysis"""
-        visualization_service = self._get_visualization_service()
-        if not visualization_service:
-            return False, "Visualization service not available", None
-        
-        try:
-            result = visualization_service.detect_component_outliers(self.config.project_id)
-            return result.success, result.message, result.data
-        except Exception as e:
-            return False, f"Outlier analysis failed: {str(e)}", None
-    
-    def get_component_distribution(self):
-        """Get component distribution data for histogram"""
-        visualization_service = self._get_visualization_service()
-        if not visualization_service:
-            return False, "Visualization service not available", None
-        
-        try:
-            result = visualization_service.get_component_distribution_data(self.config.project_id)
-            return result.success, result.message, result.data
-        except Exception as e:
-            return False, f"Distribution analysis failed: {str(e)}", None
-    
-    def get_portfolio_analysis(self):
-        """Get portfolio analysis data for bubble chart"""
-        visualization_service = self._get_visualization_service()
-        if not visualization_service:
-            return False, "Visualization service not available", None
-        
-        try:
-            result = visualization_service.get_portfolio_analysis_data(self.config.project_id)
-            return result.success, result.message, result.data
-        except Exception as e:
-            return False, f"Portfolio analysis failed: {str(e)}", None
-
     def get_signed_patent_url(self, uri: str, expires_minutes: int = 10) -> tuple[bool, str, str | None]:
         """Generate a V4 signed HTTPS URL for a given gs:// patent URI.
 
@@ -299,6 +326,10 @@ class AppController:
         except Exception as e:
             return False, f"Signing failed: {str(e)}", None
 
+    def get_signed_patent_urls(self, uris: list, expires_minutes: int = 10) -> list[str | None]:
+        """Batch version of get_signed_patent_url: one signed URL (or None) per input URI."""
+        return generate_v4_signed_urls(uris, expires_minutes=expires_minutes)
+
     def search_patents_grouped(
         self,
         query: str,
@@ -312,9 +343,8 @@ class AppController:
         if not service:
             return False, "Semantic search service not available", None
         try:
-            sanitized = service.sanitize_for_sql(query)
             df, err = service.perform_grouped_search(
-                sanitized_query=sanitized,
+                sanitized_query=query.strip(),
                 distance_threshold=distance_threshold,
                 top_k=top_k,
                 patents_limit=patents_limit,
@@ -340,11 +370,9 @@ class AppController:
         if not service:
             return False, "Semantic search service not available", None
         try:
-            sanitized_q = service.sanitize_for_sql(query)
-            sanitized_uri = service.sanitize_for_sql(uri)
             df, err = service.get_components_for_uri(
-                sanitized_query=sanitized_q,
-                sanitized_uri=sanitized_uri,
+                sanitized_query=query.strip(),
+                sanitized_uri=uri,
                 distance_threshold=distance_threshold,
                 top_k=top_k,
             )
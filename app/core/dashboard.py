@@ -2,7 +2,155 @@ from core.app_controller import AppController
 from core.interfaces.state_interface import StateInterface
 from components.ui.dashboard import DashboardUI
 from core.models import SearchRequest
+from dataclasses import dataclass
+import json
+import time
+from typing import Optional
 import pandas as pd
+import streamlit as st
+
+
+@dataclass(slots=True, frozen=True)
+class OverviewData:
+    """Business data for overview mode"""
+    mode: str = 'overview'
+    ready_for_search: bool = True
+
+
+@dataclass(slots=True, frozen=True)
+class SearchModeData:
+    """Business data for search mode"""
+    query: str
+    display_df: Optional[pd.DataFrame] = None
+    message: str = ""
+    success: bool = False
+    mode: str = 'search'
+
+
+class _SearchFailed(Exception):
+    """Raised inside the search caches so failed searches are never cached (or written to disk)"""
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+
+# Persisted to disk so popular queries survive worker restarts; max_entries bounds the cache.
+# Persisted caches ignore ttl, so the source-data version is part of the key instead
+@st.cache_data(max_entries=256, persist="disk", show_spinner=False)
+def _cached_search_results(_controller: AppController, query: str, data_version: str):
+    request = SearchRequest.model_construct(query=query.strip())
+    response = _controller.search_patents(request)
+    if not response.success:
+        raise _SearchFailed(response.message)
+    display_df = (
+        _controller.format_search_results_for_display(response)
+        if response.results
+        else None
+    )
+    return response.message, display_df
+
+
+def _cached_search(_controller: AppController, query: str):
+    """Run a flat search and build its display DataFrame, cached on the query and data version."""
+    try:
+        message, display_df = _cached_search_results(_controller, query, _current_data_version(_controller))
+    except _SearchFailed as e:
+        return False, e.message, None
+    return True, message, display_df
+
+
+# Connection probe (env validation + one service-account GET, no query job) is reused for a minute across reruns and sessions
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_connection_status(_controller: AppController):
+    return _controller.get_connection_status()
+
+
+# Grouped search and per-patent detail fetches are keyed on the query (and URI) strings;
+# failures raise _SearchFailed so a transient error is retried on the next rerun
+@st.cache_data(ttl=600, max_entries=64, show_spinner=False)
+def _cached_grouped_results(_controller: AppController, query: str):
+    ok, message, df = _controller.search_patents_grouped(query)
+    if not ok:
+        raise _SearchFailed(message)
+    return message, df
+
+
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def _cached_component_results(_controller: AppController, query: str, uri: str):
+    ok, message, df = _controller.get_patent_components(query, uri)
+    if not ok:
+        raise _SearchFailed(message)
+    return message, df
+
+
+def _cached_grouped_search(_controller: AppController, query: str):
+    try:
+        message, df = _cached_grouped_results(_controller, query)
+    except _SearchFailed as e:
+        return False, e.message, None
+    return True, message, df
+
+
+def _cached_patent_components(_controller: AppController, query: str, uri: str):
+    try:
+        message, df = _cached_component_results(_controller, query, uri)
+    except _SearchFailed as e:
+        return False, e.message, None
+    return True, message, df
+
+
+class _DashboardDataUnavailable(Exception):
+    """Raised inside the persisted cache so failed fetches are never written to disk"""
+    def __init__(self, results):
+        super().__init__("dashboard data unavailable")
+        self.results = results
+
+
+# Source-table version (latest modification time): metadata GETs, re-checked every 10 minutes
+@st.cache_data(ttl=600, show_spinner=False)
+def _cached_dashboard_data_version(_controller: AppController, project_id: str):
+    return _controller.get_dashboard_data_version()
+
+
+def _current_data_version(_controller: AppController) -> str:
+    """Key for the persisted caches: the source-table version, or the current hour when it is
+    unknown (failed or forbidden metadata GET), so entries still refresh instead of living forever"""
+    return (
+        _cached_dashboard_data_version(_controller, _controller.config.project_id)
+        or f"hour-{int(time.time() // 3600)}"
+    )
+
+
+# Raw analytics DataFrames persist to disk so restarts skip BigQuery. Persisted caches ignore
+# ttl, so the source-table version is part of the key: a table reload starts a new entry
+@st.cache_data(persist="disk", max_entries=4, show_spinner=False)
+def _cached_dashboard_data(_controller: AppController, project_id: str, data_version: str):
+    results = _controller.fetch_dashboard_data()
+    if not all(result.success for result in results):
+        raise _DashboardDataUnavailable(results)
+    return results
+
+
+# Figures and signed outlier links are rebuilt from the persisted data at most every 5 minutes
+# (signed URLs expire after 10 minutes, so a cached link always has at least 5 minutes left)
+# _DashboardDataUnavailable propagates out of the cached function, so a failed fetch is retried
+@st.cache_data(ttl=300, show_spinner=False)
+def _cached_formatted_bundle(_controller: AppController):
+    raw = _cached_dashboard_data(_controller, _controller.config.project_id, _current_data_version(_controller))
+    return _controller.format_dashboard_bundle(raw)
+
+
+def _cached_dashboard_bundle(_controller: AppController):
+    try:
+        return _cached_formatted_bundle(_controller)
+    except _DashboardDataUnavailable as e:
+        # Partial results still render (failed sections show their error), uncached
+        return _controller.format_dashboard_bundle(e.results)
+
+
+@st.fragment
+def _search_tab_fragment(engine: "DashboardEngine"):
+    engine._render_search_tab()
 
 
 class DashboardEngine:
@@ -15,7 +163,11 @@ class DashboardEngine:
         self.ui = DashboardUI()
     
     def run(self):
-        """Main orchestration method - clean UI without technical details"""
+        """Main orchestration method, run as a fragment so search interactions rerun only this tab"""
+        _search_tab_fragment(self)
+
+    def _render_search_tab(self):
+        """Render overview or search mode - clean UI without technical details"""
         # Get business data first
         if self.state.is_search_triggered():
             query = self.state.get_search_query()
@@ -25,78 +177,33 @@ class DashboardEngine:
             overview_data = self._get_overview_mode_data()
             self._render_overview_mode_ui(overview_data)
     
-    def _get_overview_mode_data(self) -> dict:
+    def _get_overview_mode_data(self) -> OverviewData:
         """Pure business logic for overview mode"""
-        return {
-            'mode': 'overview',
-            'ready_for_search': True
-        }
+        return OverviewData()
     
-    def _get_search_mode_data(self, query: str) -> dict:
-        """Pure business logic for search mode-"""
+    def _get_search_mode_data(self, query: str) -> SearchModeData:
+        """Pure business logic for search mode"""
         search_data = self._get_search_results(query)
-        return {
-            'mode': 'search',
-            'query': query,
-            'display_df': search_data.get('display_df'),
-            'message': search_data.get('message', ''),
-            'success': search_data.get('success', False)
-        }
+        return SearchModeData(
+            query=query,
+            display_df=search_data.get('display_df'),
+            message=search_data.get('message', ''),
+            success=search_data.get('success', False)
+        )
     
-    def _get_visualization_data(self) -> dict:
-        """Pure business logic for visualization data-"""
-        try:
-            status = self.controller.get_connection_status()
-            
-            if not status.gcp_connected:
-                return {
-                    'connected': False,
-                    'message': status.gcp_message,
-                    'show_placeholder': True
-                }
-            
-            # Get all visualization data
-            portfolio_result = self.controller.get_formatted_portfolio_chart_data()
-            distribution_result = self.controller.get_formatted_distribution_chart_data()
-            outlier_result = self.controller.get_formatted_component_outliers()
-            
-            return {
-                'connected': True,
-                'portfolio': {
-                    'success': portfolio_result[0],
-                    'message': portfolio_result[1],
-                    'data': portfolio_result[2]
-                },
-                'distribution': {
-                    'success': distribution_result[0],
-                    'message': distribution_result[1],
-                    'data': distribution_result[2]
-                },
-                'outliers': {
-                    'success': outlier_result[0],
-                    'message': outlier_result[1],
-                    'data': outlier_result[2]
-                }
-            }
-        except Exception as e:
-            return {
-                'connected': False,
-                'error': str(e),
-                'show_error': True
-            }
-
     # ===== UI RENDERING METHODS (Delegated to UI layer) =====
     
-    def _render_overview_mode_ui(self, data: dict):
+    def _render_overview_mode_ui(self, data: OverviewData):
         """Handle overview mode UI rendering"""
         search_actions = self.ui.render_home_overview_mode()
         
         # Handle search button click
         if search_actions['search_clicked'] and search_actions['query']:
-            # Trigger search; Streamlit rerun handled by the state adapter in production
+            # Switching to search mode needs one rerun; the caller commits it explicitly
             self.state.trigger_search(search_actions['query'])
+            self.state.commit()
 
-    def _render_search_mode_ui(self, query: str, data: dict):
+    def _render_search_mode_ui(self, query: str, data: SearchModeData):
         """Handle search mode UI rendering"""
         # Render search box (no results yet)
         search_actions = self.ui.render_home_search_mode(
@@ -115,13 +222,12 @@ class DashboardEngine:
         grouped = bool(search_actions.get('grouped', True))
         if grouped:
             # Run grouped search via controller and render compact patent cards
-            ok, msg, df = self.controller.search_patents_grouped(active_query)
+            ok, msg, df = _cached_grouped_search(self.controller, active_query)
             if ok and df is not None and not df.empty:
                 self.ui.semantic_search_tab.render_grouped_header()
 
                 # Inline streaming status + progress
                 try:
-                    import streamlit as st  # local import to avoid hard dependency at module level
                     status_ph = st.empty()
                     progress_bar = st.progress(0)
                 except Exception:
@@ -150,11 +256,10 @@ class DashboardEngine:
                             first = comps[0]
                             # Case 1: JSON strings -> parse
                             if isinstance(first, str):
-                                import json as _json
                                 parsed = []
                                 for _s in comps:
                                     try:
-                                        parsed.append(_json.loads(_s))
+                                        parsed.append(json.loads(_s))
                                     except Exception:
                                         continue
                                 comps = parsed
@@ -175,7 +280,7 @@ class DashboardEngine:
 
                     def _make_loader(u=uri):
                         def _cb():
-                            ok2, _msg2, details = self.controller.get_patent_components(active_query, u)
+                            ok2, _msg2, details = _cached_patent_components(self.controller, active_query, u)
                             return details if ok2 else None
                         return _cb
 
@@ -206,7 +311,6 @@ class DashboardEngine:
                 # Fall back to info message
                 self.ui.semantic_search_tab.render_grouped_header()
                 try:
-                    import streamlit as st
                     st.info(msg or "No patents found.")
                 except Exception:
                     pass
@@ -215,45 +319,31 @@ class DashboardEngine:
             if active_query == query:
                 # Use pre-fetched data when query hasn't changed
                 self.ui.semantic_search_tab.render_search_results(
-                    results_df=data.get('display_df'),
-                    message=data.get('message', ''),
-                    success=data.get('success', False),
+                    results_df=data.display_df,
+                    message=data.message,
+                    success=data.success,
                 )
             else:
-                # Fetch fresh flat results for the new query immediately
-                try:
-                    request = SearchRequest(query=active_query)
-                    response = self.controller.search_patents(request)
-                    if response.success and response.results:
-                        display_df = self.controller.format_search_results_for_display(response)
-                        self.ui.semantic_search_tab.render_search_results(
-                            results_df=display_df,
-                            message=response.message,
-                            success=True,
-                        )
-                    else:
-                        self.ui.semantic_search_tab.render_search_results(
-                            results_df=None,
-                            message=response.message,
-                            success=response.success,
-                        )
-                except Exception as e:
-                    self.ui.semantic_search_tab.render_search_results(
-                        results_df=None,
-                        message=f"Search error: {str(e)}",
-                        success=False,
-                    )
+                # Fetch fresh flat results for the new query immediately (cached per query)
+                fresh = self._get_search_results(active_query)
+                self.ui.semantic_search_tab.render_search_results(
+                    results_df=fresh['display_df'],
+                    message=fresh['message'],
+                    success=fresh['success'],
+                )
 
         # Handle new search
         if search_actions['search_clicked'] and search_actions['query']:
             if search_actions['query'] != query:  # New query
-                # Trigger search; Streamlit rerun handled by the state adapter in production
+                # Results for the new query were already rendered above; record it and rerun the
+                # fragment so the header shows it too (the results come back from the cache)
                 self.state.trigger_search(search_actions['query'])
+                self.state.commit()
     
     def run_data_tab(self):
-        """Handle data visualization tab with progressive loading (section-by-section)"""
+        """Handle data visualization tab: one bundled fetch, then section-by-section rendering"""
         # Check connection first for fast feedback
-        status = self.controller.get_connection_status()
+        status = _cached_connection_status(self.controller)
         if not status.gcp_connected:
             self.ui.render_data_tab_disconnected(status.gcp_message)
             return
@@ -261,79 +351,38 @@ class DashboardEngine:
         # Prepare progressive placeholders for sections
         sections = self.ui.render_data_tab_connected_progressive()
 
-        # Fetch and render each section sequentially so users see results progressively
-        # 1) Portfolio analysis
+        # Fetch all sections in one concurrent fetch, then render them in order
         try:
-            p_success, p_msg, p_chart = self.ui.run_with_spinner(
+            portfolio, distribution, outliers = self.ui.run_with_spinner(
                 sections['portfolio_section'],
                 "Loading strategic portfolio analysis...",
-                lambda: self.controller.get_formatted_portfolio_chart_data()
+                lambda: _cached_dashboard_bundle(self.controller)
             )
-            p_payload = {'success': p_success, 'message': p_msg, 'data': p_chart}
-            self.ui.render_portfolio_section(sections['portfolio_section'], p_payload)
         except Exception as e:
-            self.ui.render_section_error(sections['portfolio_section'], f"Portfolio section error: {str(e)}")
-
-        # 2) Distribution analysis
-        try:
-            d_success, d_msg, d_chart = self.ui.run_with_spinner(
-                sections['distribution_section'],
-                "Loading component distribution analysis...",
-                lambda: self.controller.get_formatted_distribution_chart_data()
-            )
-            d_payload = {'success': d_success, 'message': d_msg, 'data': d_chart}
-            self.ui.render_distribution_section(sections['distribution_section'], d_payload)
-        except Exception as e:
-            self.ui.render_section_error(sections['distribution_section'], f"Distribution section error: {str(e)}")
+            for key in ('portfolio_section', 'distribution_section', 'outlier_section'):
+                self.ui.render_section_error(sections[key], f"Dashboard data error: {str(e)}")
+            return
 
-        # 3) Outlier detection
-        try:
-            o_success, o_msg, o_df = self.ui.run_with_spinner(
-                sections['outlier_section'],
-                "Performing outlier detection analysis...",
-                lambda: self.controller.get_formatted_component_outliers()
-            )
-            o_payload = {'success': o_success, 'message': o_msg, 'data': o_df}
-            self.ui.render_outlier_section(sections['outlier_section'], o_payload)
-        except Exception as e:
-            self.ui.render_section_error(sections['outlier_section'], f"Outlier section error: {str(e)}")
+        for key, result, render in (
+            ('portfolio_section', portfolio, self.ui.render_portfolio_section),
+            ('distribution_section', distribution, self.ui.render_distribution_section),
+            ('outlier_section', outliers, self.ui.render_outlier_section),
+        ):
+            success, msg, data = result
+            render(sections[key], {'success': success, 'message': msg, 'data': data})
     
-    def _render_data_tab_ui(self, data: dict):
-        """Render data tab UI based on business data"""
-        if not data.get('connected', False):
-            # Delegate disconnected rendering to UI layer
-            self.ui.render_data_tab_disconnected(data.get('message', 'BigQuery connection required'))
-        else:
-            # Delegate connected rendering to UI layer (handles layout and spinners)
-            self.ui.render_data_tab_connected(
-                portfolio=data.get('portfolio', {}),
-                distribution=data.get('distribution', {}),
-                outliers=data.get('outliers', {})
-            )
-
     def _get_search_results(self, query: str) -> dict:
         """Get search results and format for UI (business logic only)"""
         try:
-            request = SearchRequest(query=query)
-            response = self.controller.search_patents(request)
-
-            if response.success and response.results:
-                display_df = self.controller.format_search_results_for_display(response)
-                return {
-                    'success': True,
-                    'message': response.message,
-                    'display_df': display_df
-                }
-            else:
-                return {
-                    'success': response.success,
-                    'message': response.message,
-                    'display_df': None
-                }
+            success, message, display_df = _cached_search(self.controller, query)
+            return {
+                'success': success,
+                'message': message,
+                'display_df': display_df
+            }
         except Exception as e:
             return {
                 'success': False,
                 'message': f"Search error: {str(e)}",
                 'display_df': None
             }
-
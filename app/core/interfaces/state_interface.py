@@ -34,3 +34,8 @@ class StateInterface(ABC):
     def is_overview_mode(self) -> bool:
         """Check if in overview mode (not searching)"""
         pass
+    
+    @abstractmethod
+    def commit(self) -> None:
+        """Apply pending state changes to the UI (e.g., request a rerun)"""
+        pass
@@ -1,6 +1,6 @@
 """Pydantic models for data flow between controller and UI"""
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
 
 
 class SearchRequest(BaseModel):
@@ -11,6 +11,15 @@ class SearchRequest(BaseModel):
         str_strip_whitespace = True
 
 
+# Display column -> SearchResult field, applied once per DataFrame instead of per row
+_COL_MAP = {
+    'Patent URI': 'patent_uri',
+    'Component': 'component',
+    'Function': 'function',
+    'Similarity': 'similarity',
+}
+
+
 class SearchResult(BaseModel):
     """Individual search result"""
     patent_uri: str
@@ -25,25 +34,24 @@ class SearchResponse(BaseModel):
     message: str
     results: List[SearchResult] = []
     query: str = ""
+    # Source display DataFrame, kept so the UI can skip rebuilding it from `results`
+    frame: Optional[Any] = Field(default=None, exclude=True, repr=False)
     
     @classmethod
     def from_dataframe(cls, success: bool, message: str, df=None, query: str = ""):
         """Create SearchResponse from pandas DataFrame"""
         results = []
         if df is not None and not df.empty:
-            for _, row in df.iterrows():
-                results.append(SearchResult(
-                    patent_uri=row.get('Patent URI', ''),
-                    component=row.get('Component', ''),
-                    function=row.get('Function', ''),
-                    similarity=row.get('Similarity', 0)
-                ))
+            # Columns come from the controller's display formatter, so skip per-row validation
+            records = df.rename(columns=_COL_MAP)[list(_COL_MAP.values())].to_dict('records')
+            results = [SearchResult.model_construct(**record) for record in records]
         
         return cls(
             success=success,
             message=message,
             results=results,
-            query=query
+            query=query,
+            frame=df if results else None
         )
 
 
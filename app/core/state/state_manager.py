@@ -3,7 +3,7 @@ from typing import Optional
 from core.interfaces.state_interface import StateInterface
 
 
-@dataclass
+@dataclass(slots=True)
 class AppState:
     """Application state data structure"""
     search_triggered: bool = False
@@ -44,9 +44,10 @@ class PureStateManager(StateInterface):
         """Check if in overview mode (not searching)"""
         return not self.is_search_triggered()
     
+    def commit(self) -> None:
+        """No-op: in-memory state needs no rerun to take effect"""
+        pass
+    
     def set_search_input(self, input_value: str) -> None:
         """Set search input value (helper method)"""
         self.state.search_input = input_value
-
-# Backward-compatible alias (deprecated): will be removed after migration
-StateManager = PureStateManager
@@ -9,7 +9,7 @@ class StreamlitStateAdapter(StateInterface):
     def __init__(self, rerun_callback: Optional[Callable] = None):
         """
         Initialize with optional rerun callback for testing
-        If no callback provided, uses st.rerun()
+        If no callback provided, uses st.rerun() (invoked only via commit())
         """
         self._rerun_callback = rerun_callback or st.rerun
         self._initialize_state()
@@ -35,13 +35,11 @@ class StreamlitStateAdapter(StateInterface):
         """Trigger search mode with given query"""
         st.session_state.search_query = query
         st.session_state.search_triggered = True
-        self._rerun_callback()
     
     def reset_search(self) -> None:
         """Reset search mode to overview"""
         st.session_state.search_triggered = False
         st.session_state.search_query = ""
-        self._rerun_callback()
     
     def get_search_input(self) -> Optional[str]:
         """Get search input from session state"""
@@ -50,3 +48,7 @@ class StreamlitStateAdapter(StateInterface):
     def is_overview_mode(self) -> bool:
         """Check if in overview mode (not searching)"""
         return not self.is_search_triggered()
+    
+    def commit(self) -> None:
+        """Rerun the script so pending state changes take effect"""
+        self._rerun_callback()
@@ -2,10 +2,9 @@
 
 Provide explicit names for clarity:
 - StreamlitStateManager: production adapter using st.session_state
-- PureStateManager: framework-independent in-memory manager (for tests)
+
+The framework-independent `PureStateManager` (for tests) lives in
+`core.state.state_manager` and is imported from there, so the app entry
+point never loads it.
 """
 from core.state.streamlit_state_adapter import StreamlitStateAdapter as StreamlitStateManager
-from core.state.state_manager import PureStateManager
-
-# Backward-compatible default
-StateManager = StreamlitStateManager
@@ -6,11 +6,19 @@ from core.dashboard import DashboardEngine
 from core.state_manager import StreamlitStateManager
 
 
+@st.cache_resource(show_spinner=False)
+def get_controller() -> AppController:
+    """Build the controller (and its BigQuery client/services) once per server process"""
+    return AppController()  # Uses config from environment
+
+
 def main():
     """Main application entry point"""
     # Initialize components with configuration
-    controller = AppController()  # Uses config from environment
-    state_manager = StreamlitStateManager()
+    controller = get_controller()
+    # State adapter stays per-run: it is cheap and initializes this session's keys.
+    # Mode switches rerun only the search tab fragment, not the whole page.
+    state_manager = StreamlitStateManager(rerun_callback=lambda: st.rerun(scope="fragment"))
     engine = DashboardEngine(controller, state_manager)
     
     # Render app header
@@ -20,14 +28,19 @@ def main():
     st.markdown("# 🔬 AI Patent Analyst")
     st.markdown("*From Unstructured PDFs to Queryable Knowledge Graph*")
     
-    # Two-tab layout (Visualization first)
-    tab1, tab2 = st.tabs(["📊 Data Analysis", "🔎 Semantic Search"])
+    # Two-tab layout (Visualization first); only the selected tab's content is executed
+    active_tab = st.radio(
+        "Section",
+        ["📊 Data Analysis", "🔎 Semantic Search"],
+        horizontal=True,
+        key="active_tab",
+        label_visibility="collapsed",
+    )
 
-    with tab1:
+    if active_tab == "📊 Data Analysis":
         # Engine handles data analysis tab first
         engine.run_data_tab()
-
-    with tab2:
+    else:
         # Engine orchestrates home & search as second tab
         engine.run()
 
@@ -0,0 +1,111 @@
+"""In-process brute-force alternative to BigQuery VECTOR_SEARCH for small corpora.
+
+An exported index is one directory:
+- embeddings.npy: float16 unit-length component vectors, opened as a memmap (one row per component)
+- components.parquet: uri, component_name, component_function in the same row order
+
+Cosine distance is 1 - (row . query) on unit vectors, matching VECTOR_SEARCH's COSINE.
+
+Export (from app/, with the app's .env loaded), then point LOCAL_VECTOR_INDEX_DIR at the directory:
+    python -m services.local_vector_index /path/to/local_index
+"""
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+_EMBEDDINGS_FILE = "embeddings.npy"
+_COMPONENTS_FILE = "components.parquet"
+
+
+class LocalVectorIndex:
+    """Exported component embeddings searched with a chunked float32 GEMV"""
+
+    # Rows upcast to float32 per GEMV: bounds the temporary copy (~64 MB at 768 dims)
+    CHUNK_ROWS = 1 << 15
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._matrix = np.load(os.path.join(directory, _EMBEDDINGS_FILE), mmap_mode="r")
+        self._components = pd.read_parquet(os.path.join(directory, _COMPONENTS_FILE))
+        if self._matrix.ndim != 2 or len(self._matrix) != len(self._components):
+            raise ValueError(f"Local vector index at {directory} is inconsistent")
+
+    @property
+    def dim(self) -> int:
+        return self._matrix.shape[1]
+
+    def search(self, unit_query: np.ndarray, distance_threshold: float, top_k: int) -> pd.DataFrame:
+        """Return up to top_k components with cosine distance < threshold, nearest first"""
+        query = unit_query.astype(np.float32, copy=False)
+        scores = np.empty(len(self._matrix), dtype=np.float32)
+        for start in range(0, len(self._matrix), self.CHUNK_ROWS):
+            block = self._matrix[start:start + self.CHUNK_ROWS]
+            np.matmul(block.astype(np.float32), query, out=scores[start:start + len(block)])
+
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return self._components.iloc[:0].assign(distance=np.float32())
+        candidates = np.argpartition(scores, -k)[-k:]
+        distances = 1.0 - scores[candidates]
+        keep = distances < distance_threshold
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        hits = self._components.iloc[candidates[order]].reset_index(drop=True)
+        return hits.assign(distance=distances[order].astype(np.float32))
+
+
+def load_local_index(directory: Optional[str]) -> Optional[LocalVectorIndex]:
+    """Open an exported index, or None when unset or unreadable (callers fall back to BigQuery)"""
+    if not directory:
+        return None
+    try:
+        return LocalVectorIndex(directory)
+    except (OSError, ValueError):
+        return None
+
+
+def export_local_index(client, table_id: str, directory: str, bqstorage_client=None) -> int:
+    """Download `table_id` (uri, component_name, component_function, combined_vector) into `directory`.
+
+    Rows are L2-normalized and stored as float16. Returns the number of components exported.
+    """
+    df = client.query_and_wait(
+        f"SELECT uri, component_name, component_function, combined_vector FROM `{table_id}`"
+    ).to_dataframe(bqstorage_client=bqstorage_client)
+    vectors = np.stack(df["combined_vector"].to_numpy()).astype(np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, _EMBEDDINGS_FILE), vectors.astype(np.float16))
+    df.drop(columns="combined_vector").to_parquet(os.path.join(directory, _COMPONENTS_FILE), index=False)
+    return len(df)
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Export the app's component search index to a directory for LOCAL_VECTOR_INDEX_DIR"""
+    import argparse
+    from config.settings import BQ_DATASET_ID, GOOGLE_CLOUD_PROJECT_ID
+    from services.semantic_search import SearchConfig
+    from utils.gcp_auth import get_bigquery_client, get_bqstorage_client
+
+    default_table = (f"{GOOGLE_CLOUD_PROJECT_ID}.{BQ_DATASET_ID or 'patent_analysis'}."
+                     f"{SearchConfig.search_index}")
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("directory", help="Output directory (created if missing)")
+    parser.add_argument("--table", default=default_table, help=f"Source table (default: {default_table})")
+    args = parser.parse_args(argv)
+
+    client = get_bigquery_client()
+    if client is None:
+        print("BigQuery client not available; check GOOGLE_CLOUD_PROJECT_ID and GCP_SA_KEY_JSON")
+        return 1
+    count = export_local_index(client, args.table, args.directory, get_bqstorage_client())
+    print(f"Exported {count} components from {args.table} to {args.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Disk persistence for the semantic search cache.
+
+The semantic tier survives restarts as three pieces in one directory:
+- vectors.npy: int8 query-embedding codes, opened as a memmap (one row per ring-buffer slot)
+- index.sqlite: per-slot metadata (inverse code norm, search params, timestamp, frame file)
+- frames/: one Parquet file per cached result DataFrame, read back only on a cache hit
+"""
+import os
+import sqlite3
+import threading
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class CachePersistence:
+    """Ring-buffer slots of the semantic cache mirrored to disk (best-effort; IO errors disable it)"""
+
+    def __init__(self, directory: str, capacity: int):
+        self.directory = directory
+        self.capacity = capacity
+        self._vectors_path = os.path.join(directory, "vectors.npy")
+        self._index_path = os.path.join(directory, "index.sqlite")
+        self._frames_dir = os.path.join(directory, "frames")
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._index_path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS slots (
+                slot INTEGER PRIMARY KEY,
+                inv_norm REAL NOT NULL,
+                distance_threshold REAL NOT NULL,
+                top_k INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                frame_path TEXT NOT NULL
+            )
+            """
+        )
+        return conn
+
+    def open_vectors(self, dim: int) -> np.ndarray:
+        """Return the slot matrix as a writable memmap, (re)creating it if the shape changed"""
+        os.makedirs(self._frames_dir, exist_ok=True)
+        if os.path.exists(self._vectors_path):
+            vectors = np.load(self._vectors_path, mmap_mode="r+")
+            if vectors.shape == (self.capacity, dim) and vectors.dtype == np.int8:
+                return vectors
+            del vectors
+            self.clear()
+        return np.lib.format.open_memmap(
+            self._vectors_path, mode="w+", dtype=np.int8, shape=(self.capacity, dim)
+        )
+
+    def load(self) -> Optional[Tuple[np.ndarray, np.ndarray, List[Optional[tuple]], int]]:
+        """Load (vectors memmap, inv_norms, entries, next_slot), or None when nothing usable is on disk.
+
+        Entries are (stored_at, (distance_threshold, top_k), frame_path); frames load lazily.
+        """
+        if not (os.path.exists(self._vectors_path) and os.path.exists(self._index_path)):
+            return None
+        try:
+            vectors = np.load(self._vectors_path, mmap_mode="r+")
+            if vectors.dtype != np.int8 or vectors.shape[0] != self.capacity:
+                return None
+            inv_norms = np.zeros(self.capacity, dtype=np.float32)
+            entries: List[Optional[tuple]] = [None] * self.capacity
+            newest_slot, newest_at = -1, float("-inf")
+            with self._lock, self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT slot, inv_norm, distance_threshold, top_k, stored_at, frame_path FROM slots"
+                ).fetchall()
+            for slot, inv_norm, threshold, top_k, stored_at, frame_path in rows:
+                if not 0 <= slot < self.capacity or not os.path.exists(frame_path):
+                    continue
+                inv_norms[slot] = inv_norm
+                entries[slot] = (stored_at, (threshold, top_k), frame_path)
+                if stored_at > newest_at:
+                    newest_slot, newest_at = slot, stored_at
+            return vectors, inv_norms, entries, (newest_slot + 1) % self.capacity
+        except (OSError, ValueError, sqlite3.Error):
+            return None
+
+    def write_slot(self, slot: int, inv_norm: float, params: Hashable, stored_at: float,
+                   df: pd.DataFrame) -> None:
+        """Persist one slot's metadata and frame (its codes are already in the memmap)"""
+        threshold, top_k = params
+        frame_path = os.path.join(self._frames_dir, f"{slot}.parquet")
+        df.to_parquet(frame_path, index=False)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO slots VALUES (?, ?, ?, ?, ?, ?)",
+                (slot, float(inv_norm), float(threshold), int(top_k), stored_at, frame_path),
+            )
+
+    def clear(self) -> None:
+        """Drop persisted slots (used when the embedding width or capacity changes)"""
+        with self._lock:
+            for path in (self._vectors_path, self._index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    @staticmethod
+    def read_frame(frame_path: str) -> Optional[pd.DataFrame]:
+        try:
+            return pd.read_parquet(frame_path)
+        except Exception:
+            return None
@@ -4,9 +4,77 @@ Simple implementation with independent, testable functions.
 """
 
 from google.cloud import bigquery
-from typing import Optional, Tuple
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
+from functools import cached_property
+import threading
+import time
+
+from services.local_vector_index import load_local_index
+from services.semantic_cache_store import CachePersistence
+
+# Shared result for "no rows" paths (callers only read it)
+_EMPTY_DF = pd.DataFrame()
+
+# Download dtypes per result shape: per-component rows vs. grouped per-patent rows
+_HIT_DTYPES = {"distance": "float32"}
+_GROUPED_DTYPES = {"best_distance": "float32"}
+
+# Text columns of search results: Arrow-backed strings instead of per-cell Python objects;
+# component names repeat across patents, so they are dictionary-encoded
+_TEXT_DTYPES = {
+    "uri": "string[pyarrow]",
+    "component_name": "category",
+    "component_function": "string[pyarrow]",
+}
+
+
+def _compact_text_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert whichever search-result text columns the frame has to compact dtypes"""
+    dtypes = {column: dtype for column, dtype in _TEXT_DTYPES.items() if column in df.columns}
+    return df.astype(dtypes) if dtypes else df
+
+# Words that settle the technical check locally; queries without one go to the LLM
+_TECHNICAL_TOKENS = frozenset({
+    "actuator", "adhesive", "algorithm", "alloy", "amplifier", "anode", "antenna", "antibody",
+    "battery", "bearing", "brake", "catalyst", "cathode", "chassis", "chip", "circuit", "coating",
+    "compressor", "conductor", "controller", "converter", "coolant", "detector", "device",
+    "diode", "electrode", "electrolyte", "encoder", "engine", "enzyme", "filter", "gear",
+    "generator", "heatsink", "housing", "hydraulic", "impeller", "inductor", "inverter",
+    "laser", "lens", "magnet", "membrane", "microcontroller", "module", "motor", "nozzle",
+    "optical", "piston", "polymer", "processor", "pump", "radar", "receiver", "resistor",
+    "robot", "rotor", "semiconductor", "sensor", "shaft", "signal", "solenoid", "spring",
+    "stator", "substrate", "switch", "thermostat", "transistor", "transmitter", "turbine",
+    "valve", "voltage", "wireless",
+})
+
+# Two-word-or-shorter queries made only of these are rejected locally as small talk
+_SMALL_TALK_TOKENS = frozenset({
+    "hi", "hello", "hey", "thanks", "thank", "you", "bye", "ok", "okay", "yes", "no",
+    "test", "help", "weather", "joke", "how", "are", "what", "who", "up", "good",
+    "morning", "evening", "lol",
+})
+
+_WORD_RE = re.compile(r"\w+")
+
+# Pasted text often carries Unicode spaces (NBSP, thin space, ...) and zero-width marks: spaces
+# become plain spaces and zero-width characters are dropped, so only real controls are rejected
+_QUERY_TRANSLATION = str.maketrans(
+    dict.fromkeys("\t\n\x0b\x0c\r\x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006"
+                  "\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000", " ")
+    | dict.fromkeys("\u180e\u200b\u200c\u200d\u2060\ufeff")
+)
+_CONTROL_RE = re.compile(r"[\x00-\x1f\x7f-\x9f]")  # Unicode category Cc
+
+
+def _normalize_query(text) -> str:
+    """Query text with Unicode whitespace as plain spaces, zero-width characters removed, stripped"""
+    return text.translate(_QUERY_TRANSLATION).strip() if isinstance(text, str) else ""
 
 
 @dataclass
@@ -17,112 +85,488 @@ class SearchConfig:
     embedding_model: str = "embedding_model"
     classification_model: str = "gemini_vision_analyzer"
     search_index: str = "component_search_index"
+    # Vector search result cache: exact-text tier + embedding-similarity tier
+    exact_cache_size: int = 256
+    semantic_cache_size: int = 1024
+    semantic_cache_threshold: float = 0.95
+    cache_ttl_seconds: float = 600.0
+    # Query text -> embedding LRU; the model is deterministic, so vectors stay valid far longer
+    embedding_cache_size: int = 1024
+    embedding_ttl_seconds: float = 7 * 24 * 3600.0
+    # Directory persisting the semantic tier across restarts (None keeps it in memory only)
+    cache_path: Optional[str] = None
+    # BigQuery table (in dataset_id) sharing query embeddings across restarts and replicas
+    embedding_cache_table: Optional[str] = None
+    # IVF vector index probe fraction for VECTOR_SEARCH (None keeps BigQuery's default)
+    fraction_lists_to_search: Optional[float] = None
+    # Exported component embeddings searched in-process instead of VECTOR_SEARCH (None = BigQuery)
+    local_index_path: Optional[str] = None
+    # Reject non-technical queries (LLM check fused into the search job) unless a caller opts out
+    classify_queries: bool = False
+    # Table (uri, neighbors ARRAY<STRING>) of near-duplicate patents; enables the diversity filter
+    cutoff_table: Optional[str] = None
+    diverse_results: int = 20
+
+
+class _SearchResultCache:
+    """Two-tier, thread-safe cache for vector search results.
+
+    Exact tier: LRU dict keyed on (query, params) holding result frames (and the
+    per-URI detail frames preloaded by grouped search), plus an LRU of query text ->
+    embedding (own size and TTL) so each query is embedded once. Semantic tier: ring buffer of
+    int8-quantized query embeddings (4x smaller than float32); a lookup is one
+    integer matrix-vector product against the stacked vectors. Entries expire
+    after `ttl` seconds. With `persistence`, the semantic tier is memmapped to disk
+    and reloaded on startup; persisted result frames load lazily on a hit. A small
+    in-memory ring (exact-tier size) matches classification labels the same way.
+    """
+
+    def __init__(self, exact_size: int, semantic_size: int, threshold: float, ttl: float,
+                 persistence: Optional[CachePersistence] = None,
+                 embedding_size: int = 1024, embedding_ttl: float = 7 * 24 * 3600.0):
+        self._exact: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._embeddings: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._embedding_size = embedding_size
+        self._embedding_ttl = embedding_ttl
+        self._exact_size = exact_size
+        self._semantic_size = semantic_size
+        self._threshold = threshold
+        self._ttl = ttl
+        # Semantic tier storage, allocated on first insert (embedding width is model-defined)
+        self._vectors: Optional[np.ndarray] = None
+        self._inv_norms: Optional[np.ndarray] = None
+        # Entry frames are DataFrames, or Parquet paths for slots reloaded from disk
+        self._entries: List[Optional[Tuple[float, Hashable, Any]]] = [None] * semantic_size
+        self._next_slot = 0
+        # Paraphrase tier for classification labels: unit float32 rows + (stored_at, label)
+        self._label_vectors: Optional[np.ndarray] = None
+        self._label_entries: List[Optional[Tuple[float, Any]]] = [None] * exact_size
+        self._next_label = 0
+        self._lock = threading.Lock()
+        self._persistence = persistence if semantic_size > 0 else None
+        if self._persistence is not None:
+            loaded = self._persistence.load()
+            if loaded is not None:
+                self._vectors, self._inv_norms, self._entries, self._next_slot = loaded
+
+    def _fresh(self, stored_at: float) -> bool:
+        # Wall-clock timestamps so persisted entries keep their age across restarts
+        return time.time() - stored_at < self._ttl
+
+    def get_exact(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            hit = self._exact.get(key)
+            if hit is None:
+                return None
+            stored_at, value = hit
+            if not self._fresh(stored_at):
+                del self._exact[key]
+                return None
+            self._exact.move_to_end(key)
+            return value
+
+    def put_exact(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._exact[key] = (time.time(), value)
+            self._exact.move_to_end(key)
+            while len(self._exact) > self._exact_size:
+                self._exact.popitem(last=False)
+
+    def get_embedding(self, query: str) -> Optional[List[float]]:
+        with self._lock:
+            hit = self._embeddings.get(query)
+            if hit is None:
+                return None
+            stored_at, vector = hit
+            if time.time() - stored_at >= self._embedding_ttl:
+                del self._embeddings[query]
+                return None
+            self._embeddings.move_to_end(query)
+            return vector
+
+    def put_embedding(self, query: str, vector: List[float]) -> None:
+        with self._lock:
+            self._embeddings[query] = (time.time(), vector)
+            self._embeddings.move_to_end(query)
+            while len(self._embeddings) > self._embedding_size:
+                self._embeddings.popitem(last=False)
+
+    @staticmethod
+    def _quantize(embedding: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Symmetric per-vector int8 quantization; returns (codes, 1 / ||codes||).
+
+        The per-vector scale cancels out of the cosine, so only the code norm is kept.
+        """
+        peak = float(np.abs(embedding).max()) if embedding.size else 0.0
+        if not peak:
+            return np.zeros(embedding.shape, dtype=np.int8), 0.0
+        codes = np.round(embedding * (127.0 / peak)).astype(np.int8)
+        norm = float(np.linalg.norm(codes.astype(np.float32)))
+        return codes, (1.0 / norm if norm else 0.0)
+
+    def get_similar(self, embedding: np.ndarray, params: Hashable) -> Optional[pd.DataFrame]:
+        """Return a stored result whose query embedding has cosine >= threshold (same search params)"""
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != embedding.shape[0]:
+                return None
+            codes, inv_norm = self._quantize(embedding)
+            # int8 x int8 accumulated in int32, then rescaled to cosine (empty slots score 0)
+            dots = np.einsum("ij,j->i", self._vectors, codes, dtype=np.int32)
+            scores = dots * (self._inv_norms * inv_norm)
+            for slot in np.argsort(scores)[::-1]:
+                if scores[slot] < self._threshold:
+                    break
+                entry = self._entries[slot]
+                if entry is not None and entry[1] == params and self._fresh(entry[0]):
+                    frame = entry[2]
+                    if isinstance(frame, str):
+                        frame = CachePersistence.read_frame(frame)
+                        if frame is None:
+                            continue
+                        self._entries[slot] = (entry[0], entry[1], frame)
+                    return frame
+            return None
+
+    def put_similar(self, embedding: np.ndarray, params: Hashable, df: pd.DataFrame) -> None:
+        if self._semantic_size <= 0:
+            return
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != embedding.shape[0]:
+                self._vectors = self._allocate_vectors(embedding.shape[0])
+                self._inv_norms = np.zeros(self._semantic_size, dtype=np.float32)
+                self._entries = [None] * self._semantic_size
+                self._next_slot = 0
+            slot = self._next_slot
+            stored_at = time.time()
+            self._vectors[slot], self._inv_norms[slot] = self._quantize(embedding)
+            self._entries[slot] = (stored_at, params, df)
+            self._next_slot = (slot + 1) % self._semantic_size
+            inv_norm = float(self._inv_norms[slot])
+            persistence = self._persistence
+
+        # Disk write happens outside the lock; failures just turn persistence off
+        if persistence is not None:
+            try:
+                if isinstance(self._vectors, np.memmap):
+                    self._vectors.flush()
+                persistence.write_slot(slot, inv_norm, params, stored_at, df)
+            except Exception:
+                self._persistence = None
+
+    def get_similar_label(self, embedding: np.ndarray) -> Optional[Any]:
+        """Return the label stored for the most similar recent query (cosine >= threshold)"""
+        with self._lock:
+            if self._label_vectors is None or self._label_vectors.shape[1] != embedding.shape[0]:
+                return None
+            scores = self._label_vectors @ embedding
+            slot = int(np.argmax(scores))
+            entry = self._label_entries[slot]
+            if entry is None or scores[slot] < self._threshold or not self._fresh(entry[0]):
+                return None
+            return entry[1]
+
+    def put_similar_label(self, embedding: np.ndarray, label: Any) -> None:
+        if not self._label_entries:
+            return
+        with self._lock:
+            if self._label_vectors is None or self._label_vectors.shape[1] != embedding.shape[0]:
+                self._label_vectors = np.zeros((len(self._label_entries), embedding.shape[0]), dtype=np.float32)
+                self._label_entries = [None] * len(self._label_entries)
+                self._next_label = 0
+            slot = self._next_label
+            self._label_vectors[slot] = embedding
+            self._label_entries[slot] = (time.time(), label)
+            self._next_label = (slot + 1) % len(self._label_entries)
+
+    def _allocate_vectors(self, dim: int) -> np.ndarray:
+        """Slot matrix for the semantic tier: a disk memmap when persisting, else in memory"""
+        if self._persistence is not None:
+            try:
+                return self._persistence.open_vectors(dim)
+            except Exception:
+                self._persistence = None
+        return np.zeros((self._semantic_size, dim), dtype=np.int8)
 
 
 class SemanticSearchService:
     """Service class for semantic search operations with dependency injection"""
     
-    def __init__(self, config: SearchConfig, bigquery_client: Optional[bigquery.Client] = None):
-        """Initialize with configuration and optional BigQuery client for testing"""
+    def __init__(self, config: SearchConfig, bigquery_client: Optional[bigquery.Client] = None,
+                 bqstorage_client=None):
+        """Initialize with configuration, optional BigQuery client for testing and optional Storage API read client"""
         self.config = config
         self.client = bigquery_client
+        self.bqstorage_client = bqstorage_client
+        self._result_cache = _SearchResultCache(
+            exact_size=config.exact_cache_size,
+            semantic_size=config.semantic_cache_size,
+            threshold=config.semantic_cache_threshold,
+            ttl=config.cache_ttl_seconds,
+            persistence=(
+                CachePersistence(config.cache_path, config.semantic_cache_size)
+                if config.cache_path else None
+            ),
+            embedding_size=config.embedding_cache_size,
+            embedding_ttl=config.embedding_ttl_seconds,
+        )
+        self._local_index = load_local_index(config.local_index_path)
+        # uri -> near-duplicate uris, loaded from config.cutoff_table on first use
+        self._cutoffs: Optional[Dict[str, frozenset]] = None
+        self._cutoffs_lock = threading.Lock()
     
-    def sanitize_for_sql(self, query: str) -> str:
-        """
-        Basic sanitization for SQL safety.
-        
-        Args:
-            query: Raw user input
-            
-        Returns:
-            Sanitized query string
+    # Stripped queries outside these bounds are rejected before any BigQuery ML call
+    # (two characters admits acronyms such as "IC", "UV" and "AI")
+    MIN_QUERY_LENGTH = 2
+    MAX_QUERY_LENGTH = 256
+
+    def _validate_query(self, query: str) -> Optional[str]:
+        """Return an error message for unusable (normalized) query text, or None when it can be searched"""
+        if not query:
+            return "Please enter a valid search query."
+        if len(query) < self.MIN_QUERY_LENGTH:
+            return f"Query must be at least {self.MIN_QUERY_LENGTH} characters."
+        if len(query) > self.MAX_QUERY_LENGTH:
+            return f"Query too long (maximum {self.MAX_QUERY_LENGTH} characters)."
+        if _CONTROL_RE.search(query):
+            return "Query contains unsupported control characters."
+        return None
+
+    def _job_config(self, query_parameters: list) -> bigquery.QueryJobConfig:
+        """Wrap typed parameters for client.query; the SQL text stays static per query shape,
+        so identical (text, parameters) pairs are answered from BigQuery's results cache"""
+        return bigquery.QueryJobConfig(query_parameters=query_parameters, use_query_cache=True)
+
+    def _run_to_dataframe(self, sql_query: str, params: list,
+                          dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Run a parameterized query and download it via the shared Storage API client when available.
+
+        query_and_wait uses the jobs.query API: small results come back in the first
+        response instead of after job polling plus a separate results fetch. Search
+        results (top_k rows) fit that first page, so without a shared Storage client
+        no per-call client is created either. `dtypes` must only name columns the
+        query returns (to_dataframe raises KeyError otherwise).
         """
-        if not isinstance(query, str):
-            return ""
-        
-        return query.replace("'", "\\'")
+        rows = self.client.query_and_wait(sql_query, job_config=self._job_config(params))
+        return _compact_text_columns(rows.to_dataframe(
+            bqstorage_client=self.bqstorage_client,
+            create_bqstorage_client=False,
+            dtypes=dtypes or {},
+        ))
     
-    def _build_classification_query(self, search_query: str) -> str:
-        """Build SQL query for technical classification - extracted for testing"""
-        classification_prompt = f"""
-            Is the following user query related to a technical, scientific, 
-            or engineering topic? Answer with only 'Yes' or 'No'. Query: {search_query}
-        """
-        
+    @cached_property
+    def _classification_source_sql(self) -> str:
+        """ML.GENERATE_TEXT call answering Yes/No for @q (the verdict in the classified search)"""
         return f"""
-        SELECT ml_generate_text_llm_result
-        FROM ML.GENERATE_TEXT(
+        ML.GENERATE_TEXT(
             MODEL `{self.config.project_id}.{self.config.dataset_id}.{self.config.classification_model}`,
-            (SELECT '''{classification_prompt}''' AS prompt),
+            (SELECT CONCAT(
+                'Is the following user query related to a technical, scientific, ',
+                'or engineering topic? Answer with only \\'Yes\\' or \\'No\\'. Query: ',
+                @q
+            ) AS prompt),
             STRUCT(
                 0.0 AS temperature, 
                 TRUE AS flatten_json_output, 
                 1024 AS max_output_tokens
             )
-        )
-        """
-    def is_query_technical(self, search_query: str) -> Tuple[bool, Optional[str]]:
+        )"""
+
+    def _build_classified_search_query(
+            self, search_query: str, embedding: List[float], distance_threshold: float, top_k: int
+    ) -> Tuple[str, list]:
+            """Build one job that classifies @q and, only for technical queries, returns the vector search hits.
+
+            Always yields a single row: (is_technical, hits ARRAY<STRUCT<uri, component_name,
+            component_function, distance>>).
+            """
+            sql = f"""
+                    WITH verdict AS (
+                        SELECT LOGICAL_OR(STRPOS(LOWER(ml_generate_text_llm_result), 'yes') > 0) AS is_technical
+                        FROM {self._classification_source_sql}
+                    ),
+                    hits AS (
+                        {self._vector_search_sql.strip().rstrip(';')}
+                    )
+                    SELECT
+                        IFNULL(is_technical, FALSE) AS is_technical,
+                        IF(is_technical, ARRAY(SELECT AS STRUCT * FROM hits), []) AS hits
+                    FROM verdict
+            """
+            return sql, [
+                bigquery.ScalarQueryParameter("q", "STRING", search_query),
+                bigquery.ArrayQueryParameter("emb", "FLOAT64", embedding),
+                bigquery.ScalarQueryParameter("thr", "FLOAT64", distance_threshold),
+                bigquery.ScalarQueryParameter("k", "INT64", top_k),
+            ]
+
+    def _build_embedding_query(self, search_query: str) -> Tuple[str, List[bigquery.ScalarQueryParameter]]:
+        """Build SQL and parameters that only embed the search query (same prompt as the search builders).
+
+        With an embedding cache table the same job returns the stored vector instead;
+        the model input is then empty, so no inference runs on a hit. The ts filter
+        matches the table's 7-day partition expiration so the lookup prunes partitions.
         """
-        Classify whether a query is technical using BigQuery ML.
-        
-        Args:
-            search_query: The user's search query (should be sanitized externally)
-            
+        model = f"`{self.config.project_id}.{self.config.dataset_id}.{self.config.embedding_model}`"
+        prompt = "CONCAT('Represent this technical patent component for semantic search: ', @q)"
+        if not self.config.embedding_cache_table:
+            sql = f"""
+                    SELECT ml_generate_embedding_result, FALSE AS from_cache
+                    FROM ML.GENERATE_EMBEDDING(
+                        MODEL {model},
+                        (
+                            SELECT {prompt} AS content
+                        )
+                    )
+            """
+        else:
+            sql = f"""
+                    WITH cached AS (
+                        SELECT embedding
+                        FROM `{self._embedding_cache_table_id}`
+                        WHERE query = @q
+                          AND ts >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 7 DAY)
+                        ORDER BY ts DESC
+                        LIMIT 1
+                    )
+                    SELECT embedding AS ml_generate_embedding_result, TRUE AS from_cache FROM cached
+                    UNION ALL
+                    SELECT ml_generate_embedding_result, FALSE AS from_cache
+                    FROM ML.GENERATE_EMBEDDING(
+                        MODEL {model},
+                        (
+                            SELECT {prompt} AS content
+                            FROM UNNEST([1])
+                            WHERE NOT EXISTS (SELECT 1 FROM cached)
+                        )
+                    )
+            """
+        return sql, [bigquery.ScalarQueryParameter("q", "STRING", search_query)]
+
+    @property
+    def _embedding_cache_table_id(self) -> str:
+        return f"{self.config.project_id}.{self.config.dataset_id}.{self.config.embedding_cache_table}"
+
+    def _store_embedding(self, search_query: str, vector: List[float]) -> None:
+        """Best-effort streaming insert of a freshly computed embedding into the cache table"""
+        try:
+            self.client.insert_rows_json(
+                self._embedding_cache_table_id,
+                [{"query": search_query, "embedding": vector, "ts": time.time()}],
+            )
+        except Exception:
+            pass  # the table is an optimization; the search itself already has its vector
+
+    def _embed_query(self, search_query: str) -> Tuple[Optional[List[float]], Optional[str]]:
+        """Embed the query once per query text; the vector is reused by every search builder.
+
         Returns:
-            Tuple of (is_technical: bool, error_message: Optional[str])
+            Tuple of (embedding or None, error_message)
         """
+        cached = self._result_cache.get_embedding(search_query)
+        if cached is not None:
+            return cached, None
         if not self.client:
-            return False, "BigQuery client not available"
-            
-        sql_query = self._build_classification_query(search_query)
-        
+            return None, "BigQuery client not available"
+
+        sql_query, params = self._build_embedding_query(search_query)
         try:
-            query_job = self.client.query(sql_query)
-            results = query_job.result()
-            for row in results:
-                response = row.ml_generate_text_llm_result.strip().lower()
-                if "yes" in response:
-                    return True, None
-            return False, None
+            for row in self.client.query_and_wait(sql_query, job_config=self._job_config(params)):
+                vector = list(row.ml_generate_embedding_result)
+                self._result_cache.put_embedding(search_query, vector)
+                if self.config.embedding_cache_table and not row.from_cache:
+                    self._store_embedding(search_query, vector)
+                return vector, None
         except Exception as e:
-            return False, f"Error during query classification: {str(e)}"
+            return None, f"Query embedding failed: {str(e)}"
+        return None, "Query embedding failed: no embedding returned"
+
+    @staticmethod
+    def _unit_vector(embedding: List[float]) -> Optional[np.ndarray]:
+        """Unit-length float32 copy of an embedding for the semantic cache (quantized on insert/lookup)"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def _known_classification(self, search_query: str) -> Optional[bool]:
+        """Answer the technical check without BigQuery when possible, else None.
+
+        Tries the local vocabularies (technical terms, short small talk), the exact cache, then a paraphrase of a recently
+        classified query (only when the query's embedding is already cached).
+        """
+        normalized = search_query.strip().lower()
+        tokens = set(_WORD_RE.findall(normalized))
+        if not _TECHNICAL_TOKENS.isdisjoint(tokens):
+            return True
+        if len(tokens) < 3 and tokens <= _SMALL_TALK_TOKENS:
+            return False
+
+        cache_key = ("technical", normalized)
+        cached = self._result_cache.get_exact(cache_key)
+        if cached is not None:
+            return cached
 
-    def _build_vector_search_query(self, search_query: str, distance_threshold: float, top_k: int) -> str:
-            """Build SQL query for vector search - extracted for testing"""
+        embedding = self._result_cache.get_embedding(search_query)
+        unit = self._unit_vector(embedding) if embedding is not None else None
+        if unit is not None:
+            cached = self._result_cache.get_similar_label(unit)
+            if cached is not None:
+                self._result_cache.put_exact(cache_key, cached)
+                return cached
+        return None
+
+    def _remember_classification(self, search_query: str, is_technical: bool) -> None:
+        """Cache a successful LLM classification (errors are never cached, so they retry)"""
+        self._result_cache.put_exact(("technical", search_query.strip().lower()), is_technical)
+        embedding = self._result_cache.get_embedding(search_query)
+        unit = self._unit_vector(embedding) if embedding is not None else None
+        if unit is not None:
+            self._result_cache.put_similar_label(unit, is_technical)
+
+    @cached_property
+    def _vector_search_options(self) -> str:
+        """Trailing VECTOR_SEARCH `options` argument from config ("" when unset); constant per service"""
+        if self.config.fraction_lists_to_search is None:
+            return ""
+        options = json.dumps({"fraction_lists_to_search": self.config.fraction_lists_to_search})
+        return f",\n                            options => '{options}'"
+
+    @cached_property
+    def _vector_search_sql(self) -> str:
+            """Vector search SQL, formatted once per service: only the bound parameters vary per search"""
             return f"""
-                    WITH search_results AS (
-                        SELECT
-                            base.uri, base.component_name, base.component_function, distance
-                        FROM
-                            VECTOR_SEARCH(
-                                TABLE `{self.config.project_id}.{self.config.dataset_id}.{self.config.search_index}`,
-                                'combined_vector',
-                                (
-                                    SELECT ml_generate_embedding_result
-                                    FROM ML.GENERATE_EMBEDDING(
-                                        MODEL `{self.config.project_id}.{self.config.dataset_id}.{self.config.embedding_model}`,
-                                        (
-                                            SELECT CONCAT('Represent this technical patent component for semantic search: ', '{search_query}') AS content
-                                        )
-                                    )
-                                ),
-                                top_k => {top_k},
-                                distance_type => 'COSINE'
-                            )
-                    )
-                    SELECT * FROM search_results WHERE distance < {distance_threshold};
+                    SELECT
+                        base.uri, base.component_name, base.component_function, distance
+                    FROM
+                        VECTOR_SEARCH(
+                            TABLE `{self.config.project_id}.{self.config.dataset_id}.{self.config.search_index}`,
+                            'combined_vector',
+                            (SELECT @emb AS ml_generate_embedding_result),
+                            top_k => @k,
+                            distance_type => 'COSINE'{self._vector_search_options}
+                        )
+                    WHERE distance < @thr;
             """
 
+    def _build_vector_search_query(
+            self, embedding: List[float], distance_threshold: float, top_k: int
+    ) -> Tuple[str, list]:
+            """Build SQL query and parameters for vector search over a precomputed query embedding"""
+            return self._vector_search_sql, [
+                bigquery.ArrayQueryParameter("emb", "FLOAT64", embedding),
+                bigquery.ScalarQueryParameter("thr", "FLOAT64", distance_threshold),
+                bigquery.ScalarQueryParameter("k", "INT64", top_k),
+            ]
+
     def _build_grouped_search_query(
             self,
-            search_query: str,
+            embedding: List[float],
             distance_threshold: float,
             top_k: int,
             patents_limit: int = 20,
             per_uri_limit: int = 5,
-    ) -> str:
-            """Build SQL for grouped-by-patent results with top components per URI."""
-            return f"""
+    ) -> Tuple[str, list]:
+            """Build SQL and parameters for grouped-by-patent results with top (and all) components per URI."""
+            sql = f"""
                     WITH search_results AS (
                         SELECT
                             base.uri, base.component_name, base.component_function, distance
@@ -130,40 +574,41 @@ class SemanticSearchService:
                             VECTOR_SEARCH(
                                 TABLE `{self.config.project_id}.{self.config.dataset_id}.{self.config.search_index}`,
                                 'combined_vector',
-                                (
-                                    SELECT ml_generate_embedding_result
-                                    FROM ML.GENERATE_EMBEDDING(
-                                        MODEL `{self.config.project_id}.{self.config.dataset_id}.{self.config.embedding_model}`,
-                                        (
-                                            SELECT CONCAT('Represent this technical patent component for semantic search: ', '{search_query}') AS content
-                                        )
-                                    )
-                                ),
-                                top_k => {top_k},
-                                distance_type => 'COSINE'
+                                (SELECT @emb AS ml_generate_embedding_result),
+                                top_k => @k,
+                                distance_type => 'COSINE'{self._vector_search_options}
                             )
                     )
                     SELECT
                         uri,
                         MIN(distance) AS best_distance,
                         COUNT(1) AS hit_count,
-                        ARRAY_AGG(STRUCT(component_name, component_function, distance) ORDER BY distance ASC LIMIT {per_uri_limit}) AS top_components
+                        ARRAY_AGG(STRUCT(component_name, component_function, distance) ORDER BY distance ASC LIMIT @per_uri_limit) AS top_components,
+                        -- Every hit per URI (bounded by top_k) so detail drill-downs are served from memory
+                        ARRAY_AGG(STRUCT(component_name, component_function, distance) ORDER BY distance ASC) AS all_components
                     FROM search_results
-                    WHERE distance < {distance_threshold}
+                    WHERE distance < @thr
                     GROUP BY uri
                     ORDER BY best_distance ASC
-                    LIMIT {patents_limit}
+                    LIMIT @patents_limit
             """
+            return sql, [
+                bigquery.ArrayQueryParameter("emb", "FLOAT64", embedding),
+                bigquery.ScalarQueryParameter("thr", "FLOAT64", distance_threshold),
+                bigquery.ScalarQueryParameter("k", "INT64", top_k),
+                bigquery.ScalarQueryParameter("patents_limit", "INT64", patents_limit),
+                bigquery.ScalarQueryParameter("per_uri_limit", "INT64", per_uri_limit),
+            ]
 
     def _build_detail_query(
             self,
-            search_query: str,
+            embedding: List[float],
             uri: str,
             distance_threshold: float,
             top_k: int,
-    ) -> str:
-            """Build SQL to fetch all component hits for a specific patent URI."""
-            return f"""
+    ) -> Tuple[str, list]:
+            """Build SQL and parameters to fetch all component hits for a specific patent URI."""
+            sql = f"""
                     WITH search_results AS (
                         SELECT
                             base.uri, base.component_name, base.component_function, distance
@@ -171,30 +616,29 @@ class SemanticSearchService:
                             VECTOR_SEARCH(
                                 TABLE `{self.config.project_id}.{self.config.dataset_id}.{self.config.search_index}`,
                                 'combined_vector',
-                                (
-                                    SELECT ml_generate_embedding_result
-                                    FROM ML.GENERATE_EMBEDDING(
-                                        MODEL `{self.config.project_id}.{self.config.dataset_id}.{self.config.embedding_model}`,
-                                        (
-                                            SELECT CONCAT('Represent this technical patent component for semantic search: ', '{search_query}') AS content
-                                        )
-                                    )
-                                ),
-                                top_k => {top_k},
-                                distance_type => 'COSINE'
+                                (SELECT @emb AS ml_generate_embedding_result),
+                                top_k => @k,
+                                distance_type => 'COSINE'{self._vector_search_options}
                             )
                     )
                     SELECT uri, component_name, component_function, distance
                     FROM search_results
-                    WHERE distance < {distance_threshold} AND uri = '{uri}'
+                    WHERE distance < @thr AND uri = @uri
                     ORDER BY distance ASC
             """
+            return sql, [
+                bigquery.ArrayQueryParameter("emb", "FLOAT64", embedding),
+                bigquery.ScalarQueryParameter("uri", "STRING", uri),
+                bigquery.ScalarQueryParameter("thr", "FLOAT64", distance_threshold),
+                bigquery.ScalarQueryParameter("k", "INT64", top_k),
+            ]
 
     def perform_vector_search(
         self, 
         search_query: str, 
         distance_threshold: float = 0.8,
-        top_k: int = 70
+        top_k: int = 70,
+        requested_results: Optional[int] = None,
     ) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """
         Perform vector search on patent components.
@@ -202,21 +646,140 @@ class SemanticSearchService:
         Args:
             search_query: Sanitized search query
             distance_threshold: Maximum cosine distance for results
-            top_k: Number of top results to fetch
+            top_k: Upper bound on neighbors fetched from the index
+            requested_results: Results the caller intends to show; neighbors are capped
+                at 3x this (min 30, fewer for tight distance thresholds) so the index scores
+                no more candidates than needed. None fetches the full top_k.
             
         Returns:
             Tuple of (DataFrame with search results or None, error_message)
         """
         if not self.client:
             return None, "BigQuery client not available"
+
+        top_k = self._capped_top_k(top_k, requested_results, distance_threshold)
+
+        # Tier 1: exact repeat of (query, threshold, top_k)
+        search_params = (float(distance_threshold), int(top_k))
+        cache_key = (search_query, search_params)
+        cached = self._result_cache.get_exact(cache_key)
+        if cached is not None:
+            return cached, None
+
+        # Tier 2: paraphrase of a recent query (embedding-only job, no VECTOR_SEARCH)
+        embedding, error = self._embed_query(search_query)
+        if error:
+            return None, f"Vector search failed: {error}"
+        unit = self._unit_vector(embedding)
+        if unit is not None:
+            cached = self._result_cache.get_similar(unit, search_params)
+            if cached is not None:
+                self._result_cache.put_exact(cache_key, cached)
+                return cached, None
             
-        sql_query = self._build_vector_search_query(search_query, distance_threshold, top_k)
-        
+        if self._local_index is not None and unit is not None and self._local_index.dim == unit.shape[0]:
+            # In-process GEMV over the exported corpus: no VECTOR_SEARCH job
+            df = _compact_text_columns(self._local_index.search(unit, distance_threshold, top_k))
+        else:
+            sql_query, params = self._build_vector_search_query(embedding, distance_threshold, top_k)
+            try:
+                df = self._run_to_dataframe(sql_query, params, dtypes=_HIT_DTYPES)
+            except Exception as e:
+                return None, f"Vector search failed: {str(e)}"
+
+        self._store_search_result(search_query, search_params, unit, df)
+        return df, None
+
+    # At or below this distance threshold few neighbors qualify, so fewer are fetched
+    TIGHT_DISTANCE_THRESHOLD = 0.3
+    TIGHT_TOP_K = 20
+
+    def _capped_top_k(self, top_k: int, requested_results: Optional[int],
+                      distance_threshold: float) -> int:
+        """Neighbors to fetch, never above top_k. Only capped when the caller states how many
+        results it shows: 3x that (min 30), or TIGHT_TOP_K (at least the count shown) for tight
+        thresholds. Without requested_results every qualifying neighbor up to top_k is kept."""
+        if requested_results is None:
+            return top_k
+        cap = max(requested_results * 3, 30)
+        if distance_threshold <= self.TIGHT_DISTANCE_THRESHOLD:
+            cap = min(cap, max(requested_results, self.TIGHT_TOP_K))
+        return min(top_k, cap)
+
+    def _store_search_result(self, search_query: str, search_params: Tuple[float, int],
+                             unit: Optional[np.ndarray], df: pd.DataFrame) -> None:
+        """Record a vector search result in the exact and (when embedded) semantic tiers"""
+        self._result_cache.put_exact((search_query, search_params), df)
+        if unit is not None:
+            self._result_cache.put_similar(unit, search_params, df)
+
+    def _classify_and_search(
+        self,
+        search_query: str,
+        embedding: List[float],
+        distance_threshold: float = 0.8,
+        top_k: int = 70,
+        requested_results: Optional[int] = None,
+    ) -> Tuple[bool, Optional[pd.DataFrame], Optional[str]]:
+        """Classify the query and, if technical, vector search it in a single BigQuery job.
+
+        The verdict goes to the classification caches and the hits to the result caches,
+        exactly as perform_vector_search would cache them.
+
+        Returns:
+            Tuple of (is_technical, results DataFrame or None, error_message)
+        """
+        top_k = self._capped_top_k(top_k, requested_results, distance_threshold)
+        sql_query, params = self._build_classified_search_query(
+            search_query, embedding, distance_threshold, top_k
+        )
         try:
-            df = self.client.query(sql_query).to_dataframe()
-            return df, None
+            row = next(iter(self.client.query_and_wait(sql_query, job_config=self._job_config(params))), None)
         except Exception as e:
-            return None, f"Vector search failed: {str(e)}"
+            return False, None, f"Error during query classification: {str(e)}"
+
+        is_technical = bool(row.is_technical) if row is not None else False
+        self._remember_classification(search_query, is_technical)
+        if not is_technical:
+            return False, None, None
+
+        df = pd.DataFrame(
+            [dict(hit) for hit in row.hits],
+            columns=["uri", "component_name", "component_function", "distance"],
+        ).astype({"distance": "float32", **_TEXT_DTYPES})
+        self._store_search_result(
+            search_query, (float(distance_threshold), int(top_k)), self._unit_vector(embedding), df
+        )
+        return True, df, None
+
+    def _get_cutoffs(self) -> Optional[Dict[str, frozenset]]:
+        """Load the precomputed near-duplicate table once per service (None when unset or unavailable)"""
+        if not self.config.cutoff_table or not self.client:
+            return None
+        with self._cutoffs_lock:
+            if self._cutoffs is None:
+                table_id = f"{self.config.project_id}.{self.config.dataset_id}.{self.config.cutoff_table}"
+                try:
+                    rows = self.client.query_and_wait(f"SELECT uri, neighbors FROM `{table_id}`")
+                    self._cutoffs = {row.uri: frozenset(row.neighbors or ()) for row in rows}
+                except Exception:
+                    return None  # retried on the next search
+            return self._cutoffs
+
+    @staticmethod
+    def _filter_diverse(df: pd.DataFrame, k: int, cutoffs: Dict[str, frozenset]) -> pd.DataFrame:
+        """Greedy nearest-first pick of up to k rows, skipping patents listed as near-duplicates
+        of an already picked one: O(rows + picked neighbors), no pairwise distances."""
+        excluded = set()
+        keep = []
+        for position, uri in enumerate(df["uri"]):
+            if uri in excluded:
+                continue
+            keep.append(position)
+            if len(keep) == k:
+                break
+            excluded.update(cutoffs.get(uri, ()))
+        return df.iloc[keep].reset_index(drop=True)
 
     def perform_grouped_search(
         self,
@@ -228,27 +791,53 @@ class SemanticSearchService:
     ) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """Run grouped-by-patent search and return aggregated rows per URI.
 
-        Expects pre-sanitized query text (controller sanitizes before calling).
+        Query text is normalized here (see _normalize_query); values are bound as query
+        parameters, so no escaping is needed.
         """
         if not self.client:
             return None, "BigQuery client not available"
 
-        if not sanitized_query:
-            return None, "Please enter a valid search query."
+        sanitized_query = _normalize_query(sanitized_query)
+        invalid = self._validate_query(sanitized_query)
+        if invalid:
+            return None, invalid
+
+        embedding, error = self._embed_query(sanitized_query)
+        if error:
+            return None, f"Grouped search failed: {error}"
 
-        sql_query = self._build_grouped_search_query(
-            sanitized_query,
+        sql_query, params = self._build_grouped_search_query(
+            embedding,
             distance_threshold=distance_threshold,
             top_k=top_k,
             patents_limit=patents_limit,
             per_uri_limit=per_uri_limit,
         )
         try:
-            df = self.client.query(sql_query).to_dataframe()
-            return df, None
+            df = self._run_to_dataframe(sql_query, params, dtypes=_GROUPED_DTYPES)
         except Exception as e:
             return None, f"Grouped search failed: {str(e)}"
 
+        # Keep each URI's full hit list for get_components_for_uri; callers only see the summary
+        if "all_components" in df.columns:
+            details = self._details_by_uri(df["uri"], df["all_components"])
+            self._result_cache.put_exact(
+                ("details", sanitized_query, float(distance_threshold), int(top_k)), details
+            )
+            df = df.drop(columns=["all_components"])
+        return df, None
+
+    @staticmethod
+    def _details_by_uri(uris: pd.Series, components: pd.Series) -> Dict[str, pd.DataFrame]:
+        """Split grouped all_components arrays into detail frames shaped like the detail query's rows"""
+        details: Dict[str, pd.DataFrame] = {}
+        for uri, items in zip(uris.tolist(), components.tolist()):
+            detail = pd.DataFrame(list(items) if items is not None else [],
+                                  columns=["component_name", "component_function", "distance"])
+            detail.insert(0, "uri", uri)
+            details[uri] = detail
+        return details
+
     def get_components_for_uri(
         self,
         sanitized_query: str,
@@ -258,19 +847,33 @@ class SemanticSearchService:
     ) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """Fetch detailed component hits for a given patent URI.
 
-        Expects pre-sanitized inputs (controller sanitizes before calling).
+        Uses the hits preloaded by `perform_grouped_search` when available and
+        only queries BigQuery on a miss. The query is normalized the same way, so
+        it finds the grouped search's cache entry.
         """
         if not self.client:
             return None, "BigQuery client not available"
 
+        sanitized_query = _normalize_query(sanitized_query)
         if not sanitized_query or not sanitized_uri:
             return None, "Invalid query or URI."
 
-        sql_query = self._build_detail_query(
-            sanitized_query, sanitized_uri, distance_threshold=distance_threshold, top_k=top_k
+        # Served from the grouped search that listed this URI (same query and search params)
+        details = self._result_cache.get_exact(
+            ("details", sanitized_query, float(distance_threshold), int(top_k))
+        )
+        if details is not None and sanitized_uri in details:
+            return details[sanitized_uri], None
+
+        embedding, error = self._embed_query(sanitized_query)
+        if error:
+            return None, f"Detail fetch failed: {error}"
+
+        sql_query, params = self._build_detail_query(
+            embedding, sanitized_uri, distance_threshold=distance_threshold, top_k=top_k
         )
         try:
-            df = self.client.query(sql_query).to_dataframe()
+            df = self._run_to_dataframe(sql_query, params, dtypes=_HIT_DTYPES)
             return df, None
         except Exception as e:
             return None, f"Detail fetch failed: {str(e)}"
@@ -280,7 +883,7 @@ class SemanticSearchService:
         raw_query: str,
         distance_threshold: float = 0.8,
         top_k: int = 70,
-        skip_classification: bool = False,
+        skip_classification: Optional[bool] = None,
     ) -> Tuple[bool, str, Optional[pd.DataFrame]]:
         """
         Main orchestrator function that combines all search steps.
@@ -289,44 +892,63 @@ class SemanticSearchService:
             raw_query: Raw user input
             distance_threshold: Maximum cosine distance for results
             top_k: Number of top results to fetch
-            skip_classification: Skip technical classification (useful for testing)
+            skip_classification: Skip technical classification; None follows
+                config.classify_queries (when classifying, the check and the vector
+                search share one BigQuery job)
 
         Returns:
             Tuple of (success, message, results_df)
         """
-        # Step 1: Sanitize input
-        sanitized_query = self.sanitize_for_sql(raw_query)
+        # Step 1: Normalize input (bound as a query parameter downstream, so no escaping)
+        query = _normalize_query(raw_query)
         
-        if not sanitized_query:
-            return False, "Please enter a valid search query.", None
+        invalid = self._validate_query(query)
+        if invalid:
+            return False, invalid, None
         
-        # Step 2: Check if query is technical (unless skipped)
-        # if not skip_classification:
-        #     is_technical, error = self.is_query_technical(sanitized_query)
-        #     if error:
-        #         return {
-        #             "success": False,
-        #             "message": f"Classification failed: {error}",
-        #             "results": None
-        #         }
-        #     if not is_technical:
-        #         return {
-        #             "success": False,
-        #             "message": "Query is not technical. Please enter a query related to a technical component or function.",
-        #             "results": None
-        #         }
-        
-        # Step 3: Perform vector search
-        results_df, error = self.perform_vector_search(
-            sanitized_query, 
-            distance_threshold=distance_threshold,
-            top_k=top_k
-        )
+        # Steps 2-3: Classify (unless skipped) and vector search
+        if skip_classification is None:
+            skip_classification = not self.config.classify_queries
+        if skip_classification:
+            results_df, error = self.perform_vector_search(
+                query,
+                distance_threshold=distance_threshold,
+                top_k=top_k
+            )
+        else:
+            # Embed first (cached per query text): the search reuses the vector and the
+            # classifier can answer from a paraphrase of an earlier query without the LLM
+            embedding, error = self._embed_query(query)
+            if error:
+                return False, f"Vector search failed: {error}", None
+            results_df = None
+            is_technical = self._known_classification(query)
+            if is_technical is None:
+                # One BigQuery job answers both the classification and the search
+                is_technical, results_df, class_error = self._classify_and_search(
+                    query, embedding, distance_threshold, top_k
+                )
+                if class_error:
+                    return False, f"Classification failed: {class_error}", None
+            if not is_technical:
+                return False, "Query is not technical. Please enter a query related to a technical component or function.", None
+            if results_df is None:
+                results_df, error = self.perform_vector_search(
+                    query,
+                    distance_threshold=distance_threshold,
+                    top_k=top_k
+                )
         
         if error:
             return False, error, None
         
         if results_df is None or results_df.empty:
-            return True, f"No results found for '{raw_query}'. Try a different query.", results_df or pd.DataFrame()
+            return True, f"No results found for '{raw_query}'. Try a different query.", results_df if results_df is not None else _EMPTY_DF
+
+        cutoffs = self._get_cutoffs()
+        if cutoffs is not None:
+            results_df = self._filter_diverse(
+                results_df.sort_values("distance", kind="stable"), self.config.diverse_results, cutoffs
+            )
 
         return True, f"Found {len(results_df)} results for '{raw_query}'.", results_df
@@ -1,28 +1,58 @@
 """Visualization service for data processing - handles BigQuery execution"""
 import pandas as pd
-from typing import Optional, Protocol
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Protocol
 from dataclasses import dataclass
+from functools import lru_cache
+from google.api_core.exceptions import NotFound
+from google.cloud import bigquery
 
 from utils.visualization_queries import (
     get_outlier_detection_query,
     get_component_distribution_query,
-    get_portfolio_analysis_query
+    get_portfolio_analysis_query,
+    get_materialized_query,
+    OUTLIERS_CACHE_TABLE,
+    DISTRIBUTION_CACHE_TABLE,
+    PORTFOLIO_CACHE_TABLE,
+    DASHBOARD_SOURCE_TABLES,
 )
 
+@lru_cache(maxsize=1)
+def _load_plotly():
+    """Import Plotly on the first chart build, keeping it off this module's import path.
+
+    Returns (graph_objects, qualitative palettes), or None when Plotly is not installed
+    (chart formatters then report has_plotly=False).
+    """
+    try:
+        import plotly.graph_objects as go
+        from plotly.colors import qualitative
+    except ImportError:
+        return None
+    return go, qualitative
+
+
+# Deterministic dashboard SQL: let BigQuery serve repeats from its 24h result cache
+_QUERY_JOB_CONFIG = bigquery.QueryJobConfig(use_query_cache=True)
+
 
 class BigQueryClient(Protocol):
     """Protocol for BigQuery client to enable dependency injection"""
-    def query(self, sql: str) -> 'QueryResult':
+    def query_and_wait(self, sql: str, job_config=None) -> 'QueryResult':
+        ...
+
+    def get_table(self, table: str):
         ...
 
 
 class QueryResult(Protocol):
     """Protocol for query result to enable mocking"""
-    def to_dataframe(self) -> pd.DataFrame:
+    def to_dataframe(self, bqstorage_client=None) -> pd.DataFrame:
         ...
 
 
-@dataclass
+@dataclass(slots=True)
 class VisualizationResult:
     """Structured result for visualization operations"""
     success: bool
@@ -34,12 +64,20 @@ class VisualizationResult:
 class VisualizationService:
     """Service for visualization data processing with dependency injection"""
     
-    def __init__(self, bigquery_client: Optional[BigQueryClient] = None):
-        """Initialize with optional BigQuery client for testing"""
+    def __init__(self, bigquery_client: Optional[BigQueryClient] = None, bqstorage_client=None):
+        """Initialize with optional BigQuery client for testing and optional Storage API read client"""
         self.client = bigquery_client
+        self.bqstorage_client = bqstorage_client
+        # Materialized tables found missing; later calls go straight to the full query
+        self._missing_tables: set = set()
     
-    def _execute_query(self, query: str, operation_name: str) -> VisualizationResult:
-        """Execute BigQuery query with consistent error handling"""
+    def _execute_query(self, query: str, operation_name: str, cached_table: Optional[str] = None,
+                       project_id: Optional[str] = None) -> VisualizationResult:
+        """Execute BigQuery query with consistent error handling.
+
+        When `cached_table` is given, read its daily materialization first and fall back
+        to the full query if that table does not exist.
+        """
         if not self.client:
             return VisualizationResult(
                 success=False,
@@ -48,21 +86,17 @@ class VisualizationService:
             )
         
         try:
-            result = self.client.query(query)
-            df = result.to_dataframe()
-            
-            if df.empty:
-                return VisualizationResult(
-                    success=True,
-                    message=f"No data found for {operation_name}",
-                    data=df
-                )
-            
-            return VisualizationResult(
-                success=True,
-                message=f"Retrieved {operation_name} data for {len(df)} records",
-                data=df
-            )
+            if cached_table and project_id and cached_table not in self._missing_tables:
+                try:
+                    result = self.client.query_and_wait(get_materialized_query(project_id, cached_table), job_config=_QUERY_JOB_CONFIG)
+                    df = result.to_dataframe(bqstorage_client=self.bqstorage_client)
+                    return self._result_from_dataframe(df, operation_name)
+                except NotFound:
+                    self._missing_tables.add(cached_table)
+
+            result = self.client.query_and_wait(query, job_config=_QUERY_JOB_CONFIG)
+            df = result.to_dataframe(bqstorage_client=self.bqstorage_client)
+            return self._result_from_dataframe(df, operation_name)
             
         except Exception as e:
             return VisualizationResult(
@@ -71,161 +105,209 @@ class VisualizationService:
                 error_type="query_execution_error"
             )
 
-    def detect_component_outliers(self, project_id: str) -> VisualizationResult:
-        """
-        Detect patents with anomalous number of components
-        """
-        query = get_outlier_detection_query(project_id)
-        result = self._execute_query(query, "outlier detection")
+    def _result_from_dataframe(self, df: pd.DataFrame, operation_name: str) -> VisualizationResult:
+        """Wrap a fetched DataFrame in a successful VisualizationResult"""
+        if df.empty:
+            return VisualizationResult(
+                success=True,
+                message=f"No data found for {operation_name}",
+                data=df
+            )
         
-        # Custom message for outlier detection
+        return VisualizationResult(
+            success=True,
+            message=f"Retrieved {operation_name} data for {len(df)} records",
+            data=df
+        )
+
+    def _describe_outliers(self, result: VisualizationResult) -> VisualizationResult:
+        """Custom message for outlier detection"""
         if result.success and result.data is not None:
             if result.data.empty:
                 result.message = "No significant outliers found in component counts."
             else:
                 result.message = f"Found {len(result.data)} patents with unusually high number of components."
-        
         return result
+
+    def _describe_distribution(self, result: VisualizationResult) -> VisualizationResult:
+        """Custom message for distribution"""
+        if result.success and result.data is not None and not result.data.empty:
+            result.message = f"Retrieved component distribution for {int(result.data['num_patents'].sum())} patents."
+        return result
+
+    def _describe_portfolio(self, result: VisualizationResult) -> VisualizationResult:
+        """Custom message for portfolio analysis"""
+        if result.success and result.data is not None and not result.data.empty:
+            result.message = f"Retrieved portfolio analysis for {len(result.data)} applicants."
+        return result
+
+    def detect_component_outliers(self, project_id: str) -> VisualizationResult:
+        """
+        Detect patents with anomalous number of components
+        """
+        query = get_outlier_detection_query(project_id)
+        result = self._execute_query(query, "outlier detection", OUTLIERS_CACHE_TABLE, project_id)
+        return self._describe_outliers(result)
     
     def get_component_distribution_data(self, project_id: str) -> VisualizationResult:
         """
-        Get component count distribution data for histogram
+        Get binned component count distribution (num_components, num_patents) for histogram
         """
         query = get_component_distribution_query(project_id)
-        result = self._execute_query(query, "component distribution")
-        
-        # Custom message for distribution
-        if result.success and result.data is not None and not result.data.empty:
-            result.message = f"Retrieved component distribution for {len(result.data)} patents."
-        
-        return result
+        result = self._execute_query(query, "component distribution", DISTRIBUTION_CACHE_TABLE, project_id)
+        return self._describe_distribution(result)
     
     def get_portfolio_analysis_data(self, project_id: str) -> VisualizationResult:
         """
         Get strategic patent portfolio analysis data for bubble chart
         """
         query = get_portfolio_analysis_query(project_id)
-        result = self._execute_query(query, "portfolio analysis")
-        
-        # Custom message for portfolio analysis
-        if result.success and result.data is not None and not result.data.empty:
-            result.message = f"Retrieved portfolio analysis for {len(result.data)} applicants."
-        
-        return result
-    
-    def format_outlier_data_for_display(self, df_outliers: pd.DataFrame) -> pd.DataFrame:
-        """Format outlier data for UI display table"""
-        if df_outliers is None or df_outliers.empty:
-            return df_outliers
-            
-        display_df = df_outliers.copy()
-        # Extract patent ID from URI
-        display_df['Patent'] = display_df['uri'].apply(lambda x: x.split('/')[-1])
-        # Select and rename columns
-        display_df = display_df[['Patent', 'num_components']].rename(columns={
-            'Patent': 'Patent ID',
-            'num_components': 'Component Count'
-        })
-        # Sort by component count (descending)
-        display_df = display_df.sort_values('Component Count', ascending=False)
-        
-        return display_df
+        result = self._execute_query(query, "portfolio analysis", PORTFOLIO_CACHE_TABLE, project_id)
+        return self._describe_portfolio(result)
+
+    def get_dashboard_data(self, project_id: str) -> Dict[str, VisualizationResult]:
+        """
+        Run the outlier, distribution and portfolio queries concurrently on the shared client.
+
+        BigQuery jobs are I/O-bound, so wall time is the slowest query rather than the sum.
+        Returns {'outliers', 'distribution', 'portfolio'} results; each fails independently.
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                'outliers': executor.submit(self.detect_component_outliers, project_id),
+                'distribution': executor.submit(self.get_component_distribution_data, project_id),
+                'portfolio': executor.submit(self.get_portfolio_analysis_data, project_id),
+            }
+            return {name: future.result() for name, future in futures.items()}
     
-    def format_distribution_chart_data(self, df_distribution: pd.DataFrame, df_outliers: Optional[pd.DataFrame] = None) -> dict:
-        """Format distribution data for histogram chart with complete figure"""
-        try:
-            import plotly.express as px
-            
-            # Create histogram with descriptive title
-            fig = px.histogram(
-                df_distribution,
-                x="num_components",
-                title="",
-                labels={"num_components": "Number of Components per Patent"}
-            )
-            
-            # Add outlier markers if available
-            if df_outliers is not None and not df_outliers.empty:
-                for _, row in df_outliers.iterrows():
-                    fig.add_vline(
-                        x=row['num_components'],
-                        line_width=2,
-                        line_dash="dash",
-                        line_color="red"
-                    )
-            
-            # Add an annotation for outliers (long tail)
+    def get_data_version(self, project_id: str) -> Optional[str]:
+        """Latest last-modified time across the dashboard's tables (ISO string), or None if unknown.
+
+        Table metadata GETs only (no query jobs), issued concurrently; missing tables are skipped.
+        """
+        if not self.client:
+            return None
+
+        def modified(table: str):
             try:
-                x_max = float(df_distribution["num_components"].max())
-            except Exception:
-                x_max = None
-            fig.add_annotation(
-                x=x_max if x_max is not None else 0,
-                xref="x",
-                y=1.02,
-                yref="paper",
-                showarrow=False,
-                text="Outliers: Highly Complex Inventions (>3 std. dev.)",
-                align="right"
-            )
+                return self.client.get_table(f"{project_id}.patent_analysis.{table}").modified
+            except NotFound:
+                return None
 
-            # Configure layout and center title
-            fig.update_layout(
-                xaxis_title="Number of Components",
-                yaxis_title="Number of Patents",
-                font=dict(family="Arial, sans-serif", size=12),
-                height=400
-            )
-            
-            return {
-                'figure': fig,
-                'has_plotly': True
-            }
-            
-        except ImportError:
+        try:
+            with ThreadPoolExecutor(max_workers=len(DASHBOARD_SOURCE_TABLES)) as executor:
+                times = [t for t in executor.map(modified, DASHBOARD_SOURCE_TABLES) if t is not None]
+        except Exception:
+            return None
+        return max(times).isoformat() if times else None
+
+    def format_distribution_chart_data(self, df_distribution: pd.DataFrame, df_outliers: Optional[pd.DataFrame] = None) -> dict:
+        """Format distribution data for histogram chart with complete figure (as a dict)"""
+        plotly = _load_plotly()
+        if plotly is None:
             return {
                 'figure': None,
                 'has_plotly': False,
                 'error': "Plotly not available"
             }
+        
+        go, _ = plotly
+
+        # Bins are pre-aggregated in BigQuery, so draw them as one bar trace straight from the column arrays
+        fig = go.Figure(go.Bar(
+            x=df_distribution["num_components"].to_numpy(),
+            y=df_distribution["num_patents"].to_numpy(),
+            hovertemplate="Number of Components per Patent=%{x}<br>Number of Patents=%{y}<extra></extra>",
+        ))
+        
+        # Add outlier markers if available (one layout update for all lines)
+        if df_outliers is not None and not df_outliers.empty:
+            fig.update_layout(shapes=[
+                dict(
+                    type="line", xref="x", yref="paper",
+                    x0=x, x1=x, y0=0, y1=1,
+                    line=dict(color="red", width=2, dash="dash")
+                )
+                for x in df_outliers['num_components'].to_numpy().tolist()
+            ])
+        
+        # Add an annotation for outliers (long tail)
+        try:
+            x_max = float(df_distribution["num_components"].max())
+        except Exception:
+            x_max = None
+        fig.add_annotation(
+            x=x_max if x_max is not None else 0,
+            xref="x",
+            y=1.02,
+            yref="paper",
+            showarrow=False,
+            text="Outliers: Highly Complex Inventions (>3 std. dev.)",
+            align="right"
+        )
+
+        # Configure layout and center title
+        fig.update_layout(
+            xaxis_title="Number of Components",
+            yaxis_title="Number of Patents",
+            font=dict(family="Arial, sans-serif", size=12),
+            height=400
+        )
+        
+        # Ship the serialized figure: cached payloads then skip Plotly object rebuilds on every hit
+        return {
+            'figure': fig.to_dict(),
+            'has_plotly': True
+        }
     
     def format_portfolio_chart_data(self, df_portfolio: pd.DataFrame) -> dict:
-        """Format portfolio data for bubble chart with complete figure"""
-        try:
-            import plotly.express as px
-            
-            # Create bubble chart
-            fig = px.scatter(
-                df_portfolio,
-                x="innovation_breadth",
-                y="average_connection_density",
-                size="total_patents",
-                color="applican",
-                hover_name="applican",
-                size_max=60,
-                title="",
-                labels={
-                    "innovation_breadth": "Innovation Breadth (Number of Unique Domains)",
-                    "average_connection_density": "Architectural Complexity (Avg. Connections per Patent)"
-                }
-            )
-            
-            # Configure layout
-            fig.update_layout(
-                showlegend=False,
-                xaxis_title="Innovation Breadth (Number of Unique Domains)",
-                yaxis_title="Architectural Complexity (Avg. Connections per Patent)",
-                height=400
-            )
-            
-            return {
-                'figure': fig,
-                'has_plotly': True
-            }
-            
-        except ImportError:
+        """Format portfolio data for bubble chart with complete figure (as a dict)"""
+        plotly = _load_plotly()
+        if plotly is None:
             return {
                 'figure': None,
                 'has_plotly': False,
                 'error': "Plotly not available"
             }
+        
+        go, qualitative = plotly
+
+        # Create bubble chart as a single trace; one palette color per applicant, area-scaled bubbles
+        sizes = df_portfolio["total_patents"].to_numpy()
+        applicants = df_portfolio["applican"].to_numpy()
+        codes = pd.factorize(applicants)[0]
+        palette = qualitative.Plotly
+        size_max = 60
+        fig = go.Figure(go.Scatter(
+            x=df_portfolio["innovation_breadth"].to_numpy(),
+            y=df_portfolio["average_connection_density"].to_numpy(),
+            mode="markers",
+            hovertext=applicants,
+            marker=dict(
+                size=sizes,
+                sizemode="area",
+                sizeref=2.0 * float(sizes.max()) / size_max ** 2 if len(sizes) and sizes.max() > 0 else 1,
+                sizemin=0,
+                color=[palette[code % len(palette)] for code in codes],
+            ),
+            hovertemplate=(
+                "<b>%{hovertext}</b><br><br>"
+                "Innovation Breadth (Number of Unique Domains)=%{x}<br>"
+                "Architectural Complexity (Avg. Connections per Patent)=%{y}<br>"
+                "total_patents=%{marker.size}<extra></extra>"
+            ),
+        ))
+        
+        # Configure layout
+        fig.update_layout(
+            showlegend=False,
+            xaxis_title="Innovation Breadth (Number of Unique Domains)",
+            yaxis_title="Architectural Complexity (Avg. Connections per Patent)",
+            height=400
+        )
+        
+        # Ship the serialized figure: cached payloads then skip Plotly object rebuilds on every hit
+        return {
+            'figure': fig.to_dict(),
+            'has_plotly': True
+        }
@@ -1,4 +1,7 @@
 """Connection and environment utilities for BigQuery integration"""
+import threading
+import time
+from typing import Optional
 from utils.gcp_auth import get_bigquery_client
 from config.settings import (
     BQ_DATASET_ID, 
@@ -14,43 +17,64 @@ def check_bigquery_connection(client=None):
         if not client:
             return False, "Failed to authenticate with GCP"
 
-        # Test simple query
-        query = "SELECT 1 as test"
-        client.query(query).result()
+        # One authenticated REST GET; no query job is inserted or polled
+        client.get_service_account_email()
         return True, "GCP connection successful"
 
     except Exception as e:
         return False, f"GCP connection failed: {str(e)}"
 
 
+# Both homepage counts from one job (one scan, one round-trip); built once at import
+_STATS_QUERY = f"""
+        SELECT 
+            COUNT(DISTINCT patent_id) as patent_count,
+            COUNT(*) as component_count
+        FROM `{GOOGLE_CLOUD_PROJECT_ID}.{BQ_DATASET_ID}.{BQ_TABLE_PATENT_KNOWLEDGE_GRAPH}`
+        """
+
+
+# Homepage counts barely change: reuse a successful result for an hour (defaults are never cached)
+_STATS_TTL_SECONDS = 3600
+_CACHED_STATS: Optional[tuple] = None  # (fetched_at, stats)
+_STATS_LOCK = threading.Lock()
+
+
 def get_app_stats(client=None):
     """Get basic statistics for the homepage"""
+    global _CACHED_STATS
+    cached = _CACHED_STATS
+    if cached is not None and time.monotonic() - cached[0] < _STATS_TTL_SECONDS:
+        return dict(cached[1])
+
     try:
         client = client or get_bigquery_client()
         if not client:
             return _get_default_stats()
 
-        # Combined query for better performance
-        stats_query = f"""
-        SELECT 
-            COUNT(DISTINCT patent_id) as patent_count,
-            COUNT(*) as component_count
-        FROM `{GOOGLE_CLOUD_PROJECT_ID}.{BQ_DATASET_ID}.{BQ_TABLE_PATENT_KNOWLEDGE_GRAPH}`
-        """
-
-        result = client.query(stats_query).to_dataframe()
-        row = result.iloc[0]
+        # One-row result: jobs.query returns it inline (no job polling), read off the row iterator
+        row = next(iter(client.query_and_wait(_STATS_QUERY)))
 
-        return {
-            "patent_count": int(row['patent_count']),
-            "component_count": int(row['component_count']),
+        stats = {
+            "patent_count": int(row.patent_count),
+            "component_count": int(row.component_count),
             "connection_status": "Connected to BigQuery"
         }
+        with _STATS_LOCK:
+            _CACHED_STATS = (time.monotonic(), stats)
+        return dict(stats)
 
     except Exception:
         return _get_default_stats()
 
 
+def reset_app_stats_cache() -> None:
+    """Reset the cached homepage statistics (useful for tests)."""
+    global _CACHED_STATS
+    with _STATS_LOCK:
+        _CACHED_STATS = None
+
+
 def _get_default_stats():
     """Return default statistics when BigQuery is not available"""
     return {
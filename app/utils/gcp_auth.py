@@ -3,15 +3,21 @@
 Batch 2: Decouple caching from Streamlit. Provide simple module-level caching
 with a reset hook for tests. Keep API-compatible `get_bigquery_client()`.
 """
-import json
-from typing import Optional, Dict, Any
-from google.cloud import bigquery
-from google.oauth2 import service_account
+import threading
+from typing import TYPE_CHECKING, Optional, Dict, Any
+
+# Google SDK modules are imported where authentication actually runs, keeping them off cold start
+if TYPE_CHECKING:
+    from google.auth.transport.requests import AuthorizedSession
+    from google.cloud import bigquery
+
 from config.settings import (
     GOOGLE_CLOUD_PROJECT_ID,
     GCP_SA_KEY_JSON,
     BQ_LOCATION,
+    BQ_EAGER_INIT,
     validate_config,
+    _parse_sa_key_json,
 )
 
 class GCPAuth:
@@ -31,6 +37,7 @@ class GCPAuth:
         self.config_validator = config_validator or validate_config
         self.credentials = None
         self.client = None
+        self.bqstorage_client = None
         
     def authenticate(self) -> tuple[bool, Optional[str]]:
         """Authenticate with GCP using service account key from environment
@@ -57,22 +64,48 @@ class GCPAuth:
             return False, str(e)
     
     def _parse_service_account_key(self, sa_key_json: str) -> Dict[str, Any]:
-        """Parse service account key JSON - extracted for testing"""
-        return json.loads(sa_key_json)
+        """Parse service account key JSON - extracted for testing (memoized per distinct value)"""
+        return dict(_parse_sa_key_json(sa_key_json))
     
     def _create_credentials(self, sa_key_dict: Dict[str, Any]):
         """Create credentials from service account dict - extracted for testing"""
+        from google.oauth2 import service_account
         return service_account.Credentials.from_service_account_info(sa_key_dict)
     
+    def _create_http_session(self) -> "AuthorizedSession":
+        """Authorized HTTP session with a connection pool sized for concurrent sessions and jobs"""
+        from google.auth.transport.requests import AuthorizedSession
+        from requests.adapters import HTTPAdapter
+        session = AuthorizedSession(self.credentials)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+        session.mount("https://", adapter)
+        return session
+
     def _create_bigquery_client(self):
         """Create BigQuery client - extracted for testing"""
+        from google.cloud import bigquery
         return bigquery.Client(
             credentials=self.credentials,
             project=self.project_id,
-            location=self.location
+            location=self.location,
+            _http=self._create_http_session()
         )
     
-    def get_client(self) -> Optional[bigquery.Client]:
+    def _create_bqstorage_client(self):
+        """Create BigQuery Storage read client with the same credentials - extracted for testing"""
+        from google.cloud import bigquery_storage
+        return bigquery_storage.BigQueryReadClient(credentials=self.credentials)
+
+    def get_bqstorage_client(self):
+        """Get a Storage API read client (Arrow streaming for result downloads), or None if unavailable"""
+        if self.bqstorage_client is None and self.get_client():
+            try:
+                self.bqstorage_client = self._create_bqstorage_client()
+            except ImportError:  # Storage API is optional; to_dataframe() falls back to the REST API
+                return None
+        return self.bqstorage_client
+    
+    def get_client(self) -> Optional["bigquery.Client"]:
         """Get authenticated BigQuery client
         
         Returns:
@@ -92,8 +125,13 @@ class GCPAuth:
         """Reset authentication state - useful for testing"""
         self.credentials = None
         self.client = None
+        self.bqstorage_client = None
 
-_CACHED_CLIENT: Optional[bigquery.Client] = None
+_CACHED_CLIENT: Optional["bigquery.Client"] = None
+# Auth behind the cached client; also owns the shared Storage API read client
+_CACHED_AUTH: Optional[GCPAuth] = None
+# Guards client creation so concurrent sessions share one client instead of racing to build several
+_CLIENT_LOCK = threading.Lock()
 
 
 # Global factory - separated for better testing
@@ -102,7 +140,7 @@ def create_gcp_auth() -> GCPAuth:
     return GCPAuth()
 
 
-def get_bigquery_client(use_cache: bool = True) -> Optional[bigquery.Client]:
+def get_bigquery_client(use_cache: bool = True) -> Optional["bigquery.Client"]:
     """Get BigQuery client with lightweight, test-friendly caching.
 
     Args:
@@ -111,18 +149,53 @@ def get_bigquery_client(use_cache: bool = True) -> Optional[bigquery.Client]:
     Returns:
         Optional[bigquery.Client]: Authenticated client or None if authentication failed.
     """
-    global _CACHED_CLIENT
-    if use_cache and _CACHED_CLIENT is not None:
+    global _CACHED_CLIENT, _CACHED_AUTH
+    if not use_cache:
+        return create_gcp_auth().get_client()
+
+    if _CACHED_CLIENT is not None:
+        return _CACHED_CLIENT
+
+    with _CLIENT_LOCK:
+        if _CACHED_CLIENT is None:
+            auth = create_gcp_auth()
+            client = auth.get_client()
+            if client:
+                _CACHED_CLIENT = client
+                _CACHED_AUTH = auth
+            return client
         return _CACHED_CLIENT
 
-    auth = create_gcp_auth()
-    client = auth.get_client()
-    if client and use_cache:
-        _CACHED_CLIENT = client
-    return client
+
+def get_bqstorage_client():
+    """Get the shared BigQuery Storage read client, or None when unavailable.
+
+    One gRPC client per process (created alongside the cached BigQuery client) so
+    result downloads do not each open their own Storage API channel.
+    """
+    if get_bigquery_client() is None:
+        return None
+    with _CLIENT_LOCK:
+        return _CACHED_AUTH.get_bqstorage_client() if _CACHED_AUTH else None
+
+
+def prewarm_bigquery_client() -> threading.Thread:
+    """Start building the cached client (SDK import, key parse, transport) on a daemon thread.
+
+    A request arriving mid-build blocks on _CLIENT_LOCK and reuses the result.
+    """
+    thread = threading.Thread(target=get_bigquery_client, name="bq-prewarm", daemon=True)
+    thread.start()
+    return thread
 
 
 def reset_bigquery_client_cache() -> None:
     """Reset the cached BigQuery client (useful for tests)."""
-    global _CACHED_CLIENT
-    _CACHED_CLIENT = None
+    global _CACHED_CLIENT, _CACHED_AUTH
+    with _CLIENT_LOCK:
+        _CACHED_CLIENT = None
+        _CACHED_AUTH = None
+
+
+if BQ_EAGER_INIT:
+    prewarm_bigquery_client()
@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from functools import lru_cache
 
-import json
-from google.cloud import storage
-from google.oauth2 import service_account
+import threading
 
-from config.settings import GCP_SA_KEY_JSON
+from config.settings import GCP_SA_KEY_JSON, _parse_sa_key_json
 
 
 def parse_gs_uri(gs_uri: str) -> Tuple[str, str]:
@@ -28,6 +28,42 @@ def parse_gs_uri(gs_uri: str) -> Tuple[str, str]:
     return parts[0], parts[1]
 
 
+@lru_cache(maxsize=1)
+def _get_storage_creds():
+    """Service account credentials for signing, parsed and built once per process"""
+    from google.oauth2 import service_account
+
+    sa_info = GCP_SA_KEY_JSON if isinstance(GCP_SA_KEY_JSON, dict) else _parse_sa_key_json(GCP_SA_KEY_JSON)
+    return service_account.Credentials.from_service_account_info(sa_info)
+
+
+_CACHED_STORAGE_CLIENT = None  # Optional[storage.Client]; SDK type kept lazy
+_STORAGE_CLIENT_LOCK = threading.Lock()
+
+
+def _get_storage_client():
+    """Shared storage.Client for signing (one transport/auth session per process)"""
+    global _CACHED_STORAGE_CLIENT
+    if _CACHED_STORAGE_CLIENT is not None:
+        return _CACHED_STORAGE_CLIENT
+    with _STORAGE_CLIENT_LOCK:
+        if _CACHED_STORAGE_CLIENT is None:
+            # SDK import deferred to the first signing call (off the app's cold-start path)
+            from google.cloud import storage
+
+            creds = _get_storage_creds()
+            _CACHED_STORAGE_CLIENT = storage.Client(credentials=creds, project=creds.project_id)
+        return _CACHED_STORAGE_CLIENT
+
+
+def reset_storage_client_cache() -> None:
+    """Reset the cached storage client and credentials (useful for tests)."""
+    global _CACHED_STORAGE_CLIENT
+    with _STORAGE_CLIENT_LOCK:
+        _CACHED_STORAGE_CLIENT = None
+    _get_storage_creds.cache_clear()
+
+
 def generate_v4_signed_url(gs_uri: str, expires_minutes: int = 10) -> str:
     """Generate a V4 signed URL for a GCS object referenced by a gs:// URI.
 
@@ -40,10 +76,7 @@ def generate_v4_signed_url(gs_uri: str, expires_minutes: int = 10) -> str:
     """
     bucket_name, object_name = parse_gs_uri(gs_uri)
 
-    # Build credentials from configured service account JSON
-    sa_info = GCP_SA_KEY_JSON if isinstance(GCP_SA_KEY_JSON, dict) else json.loads(GCP_SA_KEY_JSON)
-    creds = service_account.Credentials.from_service_account_info(sa_info)
-    client = storage.Client(credentials=creds, project=creds.project_id)
+    client = _get_storage_client()
 
     blob = client.bucket(bucket_name).blob(object_name)
     url = blob.generate_signed_url(
@@ -52,3 +85,20 @@ def generate_v4_signed_url(gs_uri: str, expires_minutes: int = 10) -> str:
         method="GET",
     )
     return url
+
+
+def generate_v4_signed_urls(gs_uris: Sequence[str], expires_minutes: int = 10) -> List[Optional[str]]:
+    """Sign many gs:// URIs at once on a small thread pool, sharing the cached client.
+
+    Returns URLs in input order; entries that are not valid gs:// URIs or fail to sign are None.
+    """
+    def _sign(gs_uri) -> Optional[str]:
+        try:
+            return generate_v4_signed_url(gs_uri, expires_minutes=expires_minutes)
+        except Exception:
+            return None
+
+    if not gs_uris:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(gs_uris))) as executor:
+        return list(executor.map(_sign, gs_uris))
@@ -1,63 +1,97 @@
-"""SQL queries for visualization analytics - pure SQL logic"""
+"""SQL queries for visualization analytics - pure SQL logic
 
+Getters are memoized per project, so each SQL string is formatted once and reused
+byte-for-byte (which is also what BigQuery's result cache keys on).
+"""
+from functools import lru_cache
 
+
+@lru_cache(maxsize=16)
 def get_outlier_detection_query(project_id: str) -> str:
     """Get SQL query to detect patents with anomalous number of components"""
+    # The mean/stddev come from a one-row aggregate cross-joined back, not an empty OVER()
+    # window, which would funnel every row through a single worker
     return f"""
-    WITH component_stats AS (
+    WITH component_counts AS (
       SELECT
         uri,
-        ARRAY_LENGTH(components) AS num_components,
-        AVG(ARRAY_LENGTH(components)) OVER() AS avg_components,
-        STDDEV(ARRAY_LENGTH(components)) OVER() AS stddev_components
+        ARRAY_LENGTH(components) AS num_components
       FROM
         `{project_id}.patent_analysis.patent_knowledge_graph`
+    ),
+    component_stats AS (
+      SELECT
+        AVG(num_components) + (3 * STDDEV(num_components)) AS outlier_cutoff
+      FROM
+        component_counts
     )
     SELECT
       uri,
       num_components
     FROM
+      component_counts
+    CROSS JOIN
       component_stats
     WHERE
       -- A standard statistical definition of an outlier
-      num_components > avg_components + (3 * stddev_components);
+      num_components > outlier_cutoff;
     """
 
 
+@lru_cache(maxsize=16)
 def get_component_distribution_query(project_id: str) -> str:
-    """Get SQL query to fetch component count distribution for histogram"""
+    """Get SQL query for the component count histogram, pre-binned to one row per count"""
     return f"""
     SELECT
-      ARRAY_LENGTH(components) AS num_components
+      ARRAY_LENGTH(components) AS num_components,
+      COUNT(*) AS num_patents
     FROM
       `{project_id}.patent_analysis.patent_knowledge_graph`
     WHERE
-      ARRAY_LENGTH(components) > 0;
+      ARRAY_LENGTH(components) > 0
+    GROUP BY
+      num_components
+    ORDER BY
+      num_components;
     """
 
 
+@lru_cache(maxsize=16)
 def get_portfolio_analysis_query(project_id: str) -> str:
     """Get SQL query for strategic patent portfolio analysis bubble chart"""
+    # Connections are summed per patent before the join, so only scalars (not the
+    # nested components arrays) cross the join shuffle
     return f"""
     WITH
-      patent_connection_stats AS (
+      patent_connections AS (
         SELECT
-          T1.uri,
-          T1.applican,
-          T2.invention_domain,
+          uri,
+          invention_domain,
           (
             SELECT SUM(ARRAY_LENGTH(c.connected_to))
-            FROM UNNEST(T2.components) AS c
+            FROM UNNEST(components) AS c
             WHERE c.connected_to IS NOT NULL
           ) AS total_connections
+        FROM
+          `{project_id}.patent_analysis.patent_knowledge_graph`
+        WHERE
+          invention_domain IS NOT NULL
+      ),
+      patent_connection_stats AS (
+        SELECT
+          T1.uri,
+          T1.applican,
+          T2.invention_domain,
+          T2.total_connections
         FROM
           `{project_id}.patent_analysis.ai_text_extraction` AS T1
         JOIN
-          `{project_id}.patent_analysis.patent_knowledge_graph` AS T2
+          patent_connections AS T2
         ON
           T1.uri = T2.uri
         WHERE
-          T1.applican IS NOT NULL AND T2.invention_domain IS NOT NULL
+          T1.applican IS NOT NULL
+          AND T2.total_connections > 0 -- Exclude patents with no connections to avoid skewing the average.
       )
 
     SELECT
@@ -67,8 +101,6 @@ def get_portfolio_analysis_query(project_id: str) -> str:
       COUNT(uri) AS total_patents
     FROM
       patent_connection_stats
-    WHERE
-      total_connections > 0 -- Exclude patents with no connections to avoid skewing the average.
     GROUP BY
       applican
     HAVING
@@ -76,3 +108,37 @@ def get_portfolio_analysis_query(project_id: str) -> str:
     ORDER BY
       total_patents DESC;
     """
+
+
+# Daily materializations of the three queries above (kept fresh by BigQuery scheduled queries)
+OUTLIERS_CACHE_TABLE = "viz_outliers_cache"
+DISTRIBUTION_CACHE_TABLE = "viz_distribution_cache"
+PORTFOLIO_CACHE_TABLE = "viz_portfolio_cache"
+
+# Every table the dashboard and search results come from; their last-modified times
+# version the persisted caches
+DASHBOARD_SOURCE_TABLES = (
+    "patent_knowledge_graph",
+    "ai_text_extraction",
+    "component_search_index",
+    OUTLIERS_CACHE_TABLE,
+    DISTRIBUTION_CACHE_TABLE,
+    PORTFOLIO_CACHE_TABLE,
+)
+
+
+# Tables keep no row order, so the live queries' ORDER BY is reapplied when reading them
+_MATERIALIZED_ORDER_BY = {
+    DISTRIBUTION_CACHE_TABLE: "num_components",
+    PORTFOLIO_CACHE_TABLE: "total_patents DESC",
+}
+
+
+@lru_cache(maxsize=16)
+def get_materialized_query(project_id: str, table: str) -> str:
+    """Get SQL reading a materialized visualization table (in the live query's row order)"""
+    order_by = _MATERIALIZED_ORDER_BY.get(table)
+    order_clause = f"\n    ORDER BY {order_by}" if order_by else ""
+    return f"""
+    SELECT * FROM `{project_id}.patent_analysis.{table}`{order_clause};
+    """
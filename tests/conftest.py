@@ -0,0 +1,5 @@
+"""Put app/ on sys.path the way Streamlit does, so tests import `services...` like the app"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
@@ -0,0 +1,82 @@
+"""Local vector index: export from a BigQuery stand-in, reload and brute-force search"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+
+from services import local_vector_index  # noqa: E402
+from services.local_vector_index import LocalVectorIndex, export_local_index, load_local_index  # noqa: E402
+
+
+class _Job:
+    def __init__(self, df):
+        self._df = df
+
+    def to_dataframe(self, bqstorage_client=None):
+        return self._df
+
+
+class _ExportClient:
+    """Answers the export query with a fixed component table"""
+
+    def __init__(self):
+        self.queries = []
+
+    def query_and_wait(self, sql):
+        self.queries.append(sql)
+        return _Job(pd.DataFrame({
+            "uri": ["p1", "p1", "p2"],
+            "component_name": ["rotor", "stator", "lens"],
+            "component_function": ["spins", "holds", "focuses"],
+            "combined_vector": [[2.0, 0.0, 0.0], [0.0, 3.0, 0.0], [1.0, 1.0, 0.0]],
+        }))
+
+
+def test_export_then_search_round_trip(tmp_path):
+    client = _ExportClient()
+    assert export_local_index(client, "proj.ds.components", str(tmp_path)) == 3
+    assert "`proj.ds.components`" in client.queries[0]
+
+    index = load_local_index(str(tmp_path))
+    assert index.dim == 3
+    hits = index.search(np.array([1.0, 0.0, 0.0], dtype=np.float32), distance_threshold=0.5, top_k=10)
+    assert hits["component_name"].tolist() == ["rotor", "lens"]
+    assert hits["distance"].tolist() == pytest.approx([0.0, 1 - 2 ** -0.5], abs=1e-3)
+    assert "combined_vector" not in hits.columns
+
+
+def test_search_respects_top_k(tmp_path):
+    export_local_index(_ExportClient(), "proj.ds.components", str(tmp_path))
+    index = LocalVectorIndex(str(tmp_path))
+
+    query = np.array([2 ** -0.5, 2 ** -0.5, 0.0], dtype=np.float32)
+    assert index.search(query, distance_threshold=1.0, top_k=1)["component_name"].tolist() == ["lens"]
+    assert index.search(query, distance_threshold=1.0, top_k=0).empty
+
+
+def test_load_local_index_falls_back_when_missing_or_inconsistent(tmp_path):
+    assert load_local_index(None) is None
+    assert load_local_index(str(tmp_path / "missing")) is None
+
+    export_local_index(_ExportClient(), "proj.ds.components", str(tmp_path))
+    np.save(tmp_path / "embeddings.npy", np.zeros((2, 3), dtype=np.float16))
+    assert load_local_index(str(tmp_path)) is None
+
+
+def test_main_exports_with_app_clients(tmp_path, monkeypatch):
+    pytest.importorskip("google.cloud.bigquery")
+    # config.settings reads Streamlit secrets on import; give it a project instead of the developer's
+    (tmp_path / ".streamlit").mkdir()
+    (tmp_path / ".streamlit" / "secrets.toml").write_text('GOOGLE_CLOUD_PROJECT_ID = "proj"\n')
+    monkeypatch.chdir(tmp_path)
+    gcp_auth = pytest.importorskip("utils.gcp_auth")
+    client = _ExportClient()
+    monkeypatch.setattr(gcp_auth, "get_bigquery_client", lambda: client)
+    monkeypatch.setattr(gcp_auth, "get_bqstorage_client", lambda: None)
+
+    assert local_vector_index.main([str(tmp_path / "index"), "--table", "proj.ds.components"]) == 0
+    assert load_local_index(str(tmp_path / "index")).dim == 3
+
+    monkeypatch.setattr(gcp_auth, "get_bigquery_client", lambda: None)
+    assert local_vector_index.main([str(tmp_path / "other"), "--table", "proj.ds.components"]) == 1
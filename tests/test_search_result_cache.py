@@ -0,0 +1,89 @@
+"""_SearchResultCache: exact/embedding LRU tiers and the int8 semantic tier"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("google.cloud.bigquery")
+
+from services import semantic_search  # noqa: E402
+from services.semantic_search import _SearchResultCache  # noqa: E402
+
+_PARAMS = (0.4, 50)
+
+
+def _cache(**overrides):
+    options = dict(exact_size=2, semantic_size=4, threshold=0.95, ttl=600.0)
+    options.update(overrides)
+    return _SearchResultCache(**options)
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_exact_tier_hits_misses_and_evicts_least_recently_used():
+    cache = _cache()
+    cache.put_exact("a", 1)
+    cache.put_exact("b", 2)
+    assert cache.get_exact("a") == 1  # refreshes "a", so "b" is now the oldest
+    cache.put_exact("c", 3)
+
+    assert cache.get_exact("b") is None
+    assert cache.get_exact("a") == 1
+    assert cache.get_exact("c") == 3
+    assert cache.get_exact("missing") is None
+
+
+def test_exact_tier_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_search.time, "time", lambda: now[0])
+    cache = _cache(ttl=10.0)
+    cache.put_exact("a", 1)
+
+    now[0] += 9.0
+    assert cache.get_exact("a") == 1
+    now[0] += 1.0
+    assert cache.get_exact("a") is None
+
+
+def test_embedding_tier_has_its_own_size():
+    cache = _cache(embedding_size=1)
+    cache.put_embedding("first", [1.0])
+    cache.put_embedding("second", [2.0])
+
+    assert cache.get_embedding("first") is None
+    assert cache.get_embedding("second") == [2.0]
+
+
+def test_semantic_tier_matches_paraphrases_above_threshold_only():
+    cache = _cache()
+    frame = pd.DataFrame({"uri": ["u1"]})
+    cache.put_similar(_unit(1.0, 0.0, 0.0), _PARAMS, frame)
+
+    # cosine ~0.995: a paraphrase
+    assert cache.get_similar(_unit(1.0, 0.1, 0.0), _PARAMS) is frame
+    # cosine ~0.89: a different query
+    assert cache.get_similar(_unit(1.0, 0.5, 0.0), _PARAMS) is None
+    # same vector, different search parameters
+    assert cache.get_similar(_unit(1.0, 0.0, 0.0), (0.3, 50)) is None
+    # different embedding width
+    assert cache.get_similar(_unit(1.0, 0.0), _PARAMS) is None
+
+
+def test_semantic_tier_is_a_ring_buffer():
+    cache = _cache(semantic_size=2)
+    axes = [_unit(*row) for row in np.eye(3)]
+    for index, axis in enumerate(axes):
+        cache.put_similar(axis, _PARAMS, pd.DataFrame({"uri": [f"u{index}"]}))
+
+    assert cache.get_similar(axes[0], _PARAMS) is None
+    assert cache.get_similar(axes[1], _PARAMS)["uri"].tolist() == ["u1"]
+    assert cache.get_similar(axes[2], _PARAMS)["uri"].tolist() == ["u2"]
+
+
+def test_semantic_tier_disabled_with_zero_size():
+    cache = _cache(semantic_size=0)
+    cache.put_similar(_unit(1.0, 0.0), _PARAMS, pd.DataFrame({"uri": ["u1"]}))
+
+    assert cache.get_similar(_unit(1.0, 0.0), _PARAMS) is None
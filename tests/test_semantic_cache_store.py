@@ -0,0 +1,86 @@
+"""CachePersistence: the semantic cache tier surviving a restart"""
+import sqlite3
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("pyarrow")
+pytest.importorskip("google.cloud.bigquery")
+
+from services.semantic_cache_store import CachePersistence  # noqa: E402
+from services.semantic_search import _SearchResultCache  # noqa: E402
+
+_PARAMS = (0.4, 50)
+
+
+def _cache(directory, capacity=4):
+    return _SearchResultCache(exact_size=2, semantic_size=capacity, threshold=0.95, ttl=600.0,
+                              persistence=CachePersistence(str(directory), capacity))
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_semantic_tier_reloads_after_restart(tmp_path):
+    frame = pd.DataFrame({"uri": ["u1", "u2"], "distance": [0.1, 0.2]})
+    _cache(tmp_path).put_similar(_unit(1.0, 2.0, 3.0), _PARAMS, frame)
+
+    assert (tmp_path / "vectors.npy").exists()
+    assert (tmp_path / "frames" / "0.parquet").exists()
+    with sqlite3.connect(tmp_path / "index.sqlite") as conn:
+        assert conn.execute("SELECT slot, distance_threshold, top_k FROM slots").fetchall() == [(0, 0.4, 50)]
+
+    restarted = _cache(tmp_path)
+    pd.testing.assert_frame_equal(restarted.get_similar(_unit(1.0, 2.0, 3.0), _PARAMS), frame)
+    assert restarted.get_similar(_unit(3.0, 2.0, 1.0), _PARAMS) is None
+
+
+def test_reloaded_cache_appends_after_newest_slot(tmp_path):
+    axes = [_unit(*row) for row in np.eye(3)]
+    first = _cache(tmp_path, capacity=2)
+    first.put_similar(axes[0], _PARAMS, pd.DataFrame({"uri": ["u0"]}))
+    first.put_similar(axes[1], _PARAMS, pd.DataFrame({"uri": ["u1"]}))
+
+    # Ring is full: the next insert after a restart overwrites the oldest slot
+    second = _cache(tmp_path, capacity=2)
+    second.put_similar(axes[2], _PARAMS, pd.DataFrame({"uri": ["u2"]}))
+
+    third = _cache(tmp_path, capacity=2)
+    assert third.get_similar(axes[0], _PARAMS) is None
+    assert third.get_similar(axes[1], _PARAMS)["uri"].tolist() == ["u1"]
+    assert third.get_similar(axes[2], _PARAMS)["uri"].tolist() == ["u2"]
+
+
+def test_open_vectors_recreates_store_when_width_changes(tmp_path):
+    store = CachePersistence(str(tmp_path), capacity=3)
+    vectors = store.open_vectors(4)
+    assert vectors.shape == (3, 4) and vectors.dtype == np.int8
+    vectors[0] = 7
+    vectors.flush()
+    del vectors
+
+    assert store.open_vectors(4)[0].tolist() == [7, 7, 7, 7]
+    resized = store.open_vectors(8)
+    assert resized.shape == (3, 8)
+    assert not resized.any()
+
+
+def test_capacity_change_discards_persisted_slots(tmp_path):
+    _cache(tmp_path, capacity=4).put_similar(_unit(1.0, 0.0), _PARAMS, pd.DataFrame({"uri": ["u1"]}))
+
+    assert CachePersistence(str(tmp_path), capacity=8).load() is None
+    assert _cache(tmp_path, capacity=8).get_similar(_unit(1.0, 0.0), _PARAMS) is None
+
+
+def test_slot_with_missing_frame_is_skipped(tmp_path):
+    _cache(tmp_path).put_similar(_unit(1.0, 0.0), _PARAMS, pd.DataFrame({"uri": ["u1"]}))
+    (tmp_path / "frames" / "0.parquet").unlink()
+
+    assert _cache(tmp_path).get_similar(_unit(1.0, 0.0), _PARAMS) is None
+
+
+def test_load_without_files_returns_none(tmp_path):
+    assert CachePersistence(str(tmp_path), capacity=4).load() is None
@@ -0,0 +1,179 @@
+"""SemanticSearchService against a BigQuery client stand-in returning real RowIterators"""
+import pytest
+
+pytest.importorskip("pandas")
+bigquery = pytest.importorskip("google.cloud.bigquery")
+from google.cloud.bigquery.table import RowIterator  # noqa: E402
+
+from services.semantic_search import SearchConfig, SemanticSearchService, _normalize_query  # noqa: E402
+
+_COMPONENT = bigquery.SchemaField(
+    "component", "RECORD", mode="REPEATED",
+    fields=[
+        bigquery.SchemaField("component_name", "STRING"),
+        bigquery.SchemaField("component_function", "STRING"),
+        bigquery.SchemaField("distance", "FLOAT"),
+    ],
+)
+_GROUPED_SCHEMA = [
+    bigquery.SchemaField("uri", "STRING"),
+    bigquery.SchemaField("best_distance", "FLOAT"),
+    bigquery.SchemaField("hit_count", "INTEGER"),
+    bigquery.SchemaField("top_components", "RECORD", mode="REPEATED", fields=_COMPONENT.fields),
+    bigquery.SchemaField("all_components", "RECORD", mode="REPEATED", fields=_COMPONENT.fields),
+]
+
+
+_CLASSIFIED_SCHEMA = [
+    bigquery.SchemaField("is_technical", "BOOLEAN"),
+    bigquery.SchemaField("hits", "RECORD", mode="REPEATED", fields=[
+        bigquery.SchemaField("uri", "STRING"),
+        bigquery.SchemaField("component_name", "STRING"),
+        bigquery.SchemaField("component_function", "STRING"),
+        bigquery.SchemaField("distance", "FLOAT"),
+    ]),
+]
+
+
+def _components(*items):
+    return {"v": [{"v": {"f": [{"v": name}, {"v": function}, {"v": str(distance)}]}}
+                  for name, function, distance in items]}
+
+
+class _OneResultClient:
+    """BigQuery client stand-in returning one fixed result page from query_and_wait"""
+
+    def __init__(self, schema, rows):
+        self.schema = schema
+        self.rows = rows
+        self.queries = []
+
+    def query_and_wait(self, sql, job_config=None):
+        self.queries.append(sql)
+        return RowIterator(
+            client=None, api_request=None, path=None, schema=self.schema,
+            first_page_response={"rows": self.rows, "totalRows": str(len(self.rows))},
+            total_rows=len(self.rows),
+        )
+
+
+def test_grouped_search_downloads_rows_without_a_distance_column():
+    hits = _components(("gear", "transmits torque", 0.12), ("shaft", "carries gear", 0.2))
+    client = _OneResultClient(_GROUPED_SCHEMA, [
+        {"f": [{"v": "gs://patents/a.pdf"}, {"v": "0.12"}, {"v": "2"}, hits, hits]},
+    ])
+    service = SemanticSearchService(SearchConfig(project_id="p"), bigquery_client=client)
+    service._result_cache.put_embedding("gear train", [0.1, 0.2, 0.3])
+
+    df, error = service.perform_grouped_search("gear train")
+
+    assert error is None
+    assert list(df.columns) == ["uri", "best_distance", "hit_count", "top_components"]
+    assert str(df["best_distance"].dtype) == "float32"
+
+    detail, error = service.get_components_for_uri("gear train", "gs://patents/a.pdf")
+    assert error is None
+    assert detail["component_name"].tolist() == ["gear", "shaft"]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("heat\xa0exchanger", "heat exchanger"),
+    ("motor\u2009valve", "motor valve"),
+    ("gear\u200btrain", "geartrain"),
+    ("\ufeff pump\t", "pump"),
+])
+def test_pasted_unicode_spacing_is_normalized_and_accepted(raw, expected):
+    service = SemanticSearchService(SearchConfig(project_id="p"))
+    assert _normalize_query(raw) == expected
+    assert service._validate_query(_normalize_query(raw)) is None
+
+
+def test_control_characters_are_still_rejected():
+    service = SemanticSearchService(SearchConfig(project_id="p"))
+    assert service._validate_query(_normalize_query("gear\x07train")) == (
+        "Query contains unsupported control characters."
+    )
+
+
+@pytest.mark.parametrize("requested, threshold, expected", [
+    (None, 0.8, 70),
+    (None, 0.2, 70),  # no silent cap for tight thresholds unless a count is requested
+    (5, 0.8, 30),
+    (5, 0.2, 20),
+    (30, 0.2, 30),
+])
+def test_top_k_is_capped_only_for_a_requested_result_count(requested, threshold, expected):
+    service = SemanticSearchService(SearchConfig(project_id="p"))
+    assert service._capped_top_k(70, requested, threshold) == expected
+
+
+@pytest.mark.parametrize("query", ["IC", "UV", "AI"])
+def test_two_letter_technical_queries_are_accepted(query):
+    assert SemanticSearchService(SearchConfig(project_id="p"))._validate_query(query) is None
+
+
+def test_single_character_and_blank_queries_are_rejected():
+    service = SemanticSearchService(SearchConfig(project_id="p"))
+    assert service._validate_query("x") == "Query must be at least 2 characters."
+    assert service._validate_query(_normalize_query(" \xa0 ")) == "Please enter a valid search query."
+
+
+def _classified_client(is_technical):
+    hits = {"v": [{"v": {"f": [{"v": "gs://patents/a.pdf"}, {"v": "fan"}, {"v": "moves air"}, {"v": "0.1"}]}}]}
+    return _OneResultClient(_CLASSIFIED_SCHEMA, [{"f": [{"v": str(is_technical).lower()}, hits]}])
+
+
+def _classifying_service(client):
+    return SemanticSearchService(SearchConfig(project_id="p", classify_queries=True), bigquery_client=client)
+
+
+def test_classified_search_answers_check_and_search_in_one_job():
+    client = _classified_client(True)
+    service = _classifying_service(client)
+    service._result_cache.put_embedding("cooling fan assembly", [1.0, 0.0, 0.0])
+
+    success, _message, df = service.run_semantic_search("cooling fan assembly")
+
+    assert success
+    assert df["component_name"].tolist() == ["fan"]
+    assert len(client.queries) == 1
+    assert "ML.GENERATE_TEXT" in client.queries[0] and "VECTOR_SEARCH" in client.queries[0]
+
+
+def test_classified_search_rejects_non_technical_queries():
+    service = _classifying_service(_classified_client(False))
+    service._result_cache.put_embedding("recipe for banana bread", [0.0, 1.0, 0.0])
+
+    success, message, df = service.run_semantic_search("recipe for banana bread")
+
+    assert not success and df is None
+    assert message.startswith("Query is not technical")
+
+
+def test_paraphrase_reuses_classification_and_results_without_a_job():
+    client = _classified_client(True)
+    service = _classifying_service(client)
+    service._result_cache.put_embedding("cooling fan assembly", [1.0, 0.0, 0.0])
+    service._result_cache.put_embedding("assembly of a cooling fan", [0.99, 0.05, 0.0])
+    service.run_semantic_search("cooling fan assembly")
+
+    success, _message, df = service.run_semantic_search("assembly of a cooling fan")
+
+    assert success and df["component_name"].tolist() == ["fan"]
+    assert len(client.queries) == 1
+
+
+def test_classification_is_off_unless_configured():
+    client = _OneResultClient([
+        bigquery.SchemaField("uri", "STRING"),
+        bigquery.SchemaField("component_name", "STRING"),
+        bigquery.SchemaField("component_function", "STRING"),
+        bigquery.SchemaField("distance", "FLOAT"),
+    ], [{"f": [{"v": "gs://patents/a.pdf"}, {"v": "fan"}, {"v": "moves air"}, {"v": "0.1"}]}])
+    service = SemanticSearchService(SearchConfig(project_id="p"), bigquery_client=client)
+    service._result_cache.put_embedding("recipe for banana bread", [0.0, 1.0, 0.0])
+
+    success, _message, _df = service.run_semantic_search("recipe for banana bread")
+
+    assert success
+    assert "ML.GENERATE_TEXT" not in client.queries[0]